@@ -1,10 +1,22 @@
 import sys
 import os
+from skcore import startup
+
+if "--startup-report" in sys.argv:
+    startup.enable()
+
+from skcore import trace
+from skcore.config import load_settings
+
+trace.enable_from_environment(load_settings())
+
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
 from PySide6.QtCore import Qt
 from skui.main_window import MainWindow
 
+startup.mark("imports")
+
 def setup_environment(base_path):
     data_path = os.path.join(base_path, "data")
 
@@ -17,13 +29,47 @@ def setup_environment(base_path):
     for folder in folders:
         os.makedirs(folder, exist_ok=True)
 
+def prune_runners(dry_run=False, force=False):
+    from skcore.database import load_games
+    from skcore.manifest import get_runner_manifest, format_size
+
+    games = load_games(strict=True)
+    if games is None:
+        print("Cannot read the game library; refusing to prune runners.")
+        return
+
+    manifest = get_runner_manifest()
+    manifest.refresh()
+    if not games and not force and manifest.prune(games, dry_run=True):
+        print("The game library is empty, so every runner looks unused. "
+              "Pass --force to remove them all.")
+        return
+    removed = manifest.prune(games, dry_run=dry_run)
+
+    verb = "Would remove" if dry_run else "Removed"
+    for entry in removed:
+        print(f"{verb} {entry['type']} {entry['version']} ({format_size(entry.get('size', 0))})")
+    print(f"{verb} {len(removed)} unused runners, {format_size(sum(e.get('size', 0) for e in removed))} total.")
+
 def main():
     basedir = os.path.dirname(os.path.abspath(__file__))
 
-    setup_environment(basedir)
+    with trace.span("setup_environment"):
+        setup_environment(basedir)
+    startup.mark("setup_environment")
+
+    if "--rollback-update" in sys.argv:
+        from setting.updater import rollback_update
+        print("Previous version restored." if rollback_update(basedir) else "No update to roll back.")
+        return
+
+    if "--prune-runners" in sys.argv:
+        prune_runners(dry_run="--dry-run" in sys.argv, force="--force" in sys.argv)
+        return
 
     app = QApplication(sys.argv)
     app.setApplicationName("SK | Player Launcher")
+    startup.mark("QApplication")
 
     app.setDesktopFileName("sk-player")
 
@@ -38,13 +84,21 @@ def main():
     theme_path = os.path.join(basedir, "theme", "breeze_dark.qss")
     if os.path.exists(theme_path):
         try:
-            with open(theme_path, "r") as f:
+            with open(theme_path, "r") as f, trace.span("app.setStyleSheet"):
                 app.setStyleSheet(f.read())
         except Exception as e:
             print(f"Theme Load Error: {e}")
 
-    window = MainWindow()
-    window.show()
+    with trace.span("MainWindow.__init__"):
+        window = MainWindow()
+    startup.mark("MainWindow shell")
+    with trace.span("window.show"):
+        window.show()
+    startup.mark("window.show")
+
+    from skcore.config import get_settings_service
+    from skcore.tasks import start_stall_detector
+    start_stall_detector(get_settings_service().get("stall_threshold_ms", 250))
 
     sys.exit(app.exec())
 
@@ -0,0 +1,460 @@
+"""Benchmarks for the storage, runner install and launch paths.
+
+    python scripts/bench_backend.py --save-baseline data/bench/backend-baseline.json
+    python scripts/bench_backend.py --baseline data/bench/backend-baseline.json
+    python -m pytest scripts/bench_backend.py          # small scale, as tests
+
+Fixtures are generated into a throwaway working directory: a large
+games.json, a runner tarball shaped like a Proton build (tens of thousands
+of small files plus a few large libraries) and a local HTTP server that
+stands in for the GitHub releases API and asset downloads. Every case
+reports throughput (records/s, files/s, MB/s), which ``--baseline``
+compares like the timings.
+
+Under pytest, ``SK_BENCH_SCALE`` picks the scale and ``SK_BENCH_BASELINE``
+fails a test whose case regressed against that report.
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchlib
+
+sys.path.insert(0, benchlib.ROOT)
+
+MB = 1024 * 1024
+SCALES = {
+    "small": {"records": 2000, "files": 2000, "large_files": 1, "large_mb": 4, "releases": 30, "repeat": 2},
+    "default": {"records": 20000, "files": 20000, "large_files": 4, "large_mb": 16, "releases": 30, "repeat": 3},
+    "large": {"records": 100000, "files": 60000, "large_files": 8, "large_mb": 64, "releases": 100, "repeat": 3},
+}
+CASES = ("database", "runner_versions", "download", "extract", "launch_env")
+RUNNER_VERSION = "GE-Proton-bench"
+VERSION_CALLS = 20
+LAUNCH_CALLS = 200
+
+_fixtures_dir = None
+
+
+# -- Workspace -----------------------------------------------------------------
+
+def _remove_fixtures():
+    if _fixtures_dir:
+        shutil.rmtree(_fixtures_dir, ignore_errors=True)
+
+
+def shared_fixtures_dir():
+    """Where generated archives live for this run; cases reuse them."""
+    global _fixtures_dir
+    if _fixtures_dir is None:
+        _fixtures_dir = tempfile.mkdtemp(prefix="sk-bench-fixtures-")
+        atexit.register(_remove_fixtures)
+    return _fixtures_dir
+
+
+@contextlib.contextmanager
+def workspace():
+    """A throwaway working directory. skcore resolves its data/ paths on
+    first import, so cases import it only once inside."""
+    workdir = tempfile.mkdtemp(prefix="sk-bench-backend-")
+    os.makedirs(os.path.join(workdir, "data"))
+    with open(os.path.join(workdir, "data", "settings.json"), "w") as f:
+        json.dump({"check_updates": False}, f)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from PySide6.QtCore import QCoreApplication
+
+        app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+        yield app
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# -- Fixtures ------------------------------------------------------------------
+
+def make_games(count, exe=""):
+    rng = random.Random(count)
+    words = ("Shadow", "Crystal", "Iron", "Last", "Neon", "Frozen", "Silent", "Crimson", "Star", "Lost",
+             "Kingdom", "Drift", "Legacy", "Protocol", "Horizon", "Echo", "Rift", "Harbor", "Engine", "Saga")
+    games = []
+    for i in range(count):
+        name = f"{rng.choice(words)} {rng.choice(words)} {i}"
+        games.append({
+            "name": name,
+            "path": exe or f"/games/{name.replace(' ', '_')}/Game.exe",
+            "banner": f"data/banners/{i}.jpg",
+            "banner_type": "wide" if i % 10 == 0 else "long",
+            "version": f"1.{i % 10}.{rng.randrange(100)}",
+            "runner_type": ("System", "Wine", "Proton")[i % 3],
+            "runner_version": "" if i % 3 == 0 else RUNNER_VERSION,
+            "description": " ".join(rng.choice(words) for _ in range(rng.randrange(8, 40))),
+        })
+    return games
+
+
+def _runner_paths(files):
+    """Relative paths for a Proton-shaped tree: bin/, DLL folders and a big
+    protonfixes directory of tiny files."""
+    paths = ["proton", "files/bin/wine", "files/bin/wine64", "files/bin/wineserver", "files/bin/wineboot"]
+    folders = ("files/lib/wine/x86_64-windows", "files/lib/wine/i386-windows", "files/lib/wine/x86_64-unix",
+               "files/share/wine/fonts", "protonfixes/gamefixes-steam", "protonfixes/gamefixes-gog")
+    for i in range(files - len(paths)):
+        folder = folders[i % len(folders)]
+        extension = ".py" if folder.startswith("protonfixes") else ".dll"
+        paths.append(f"{folder}/f{i:06d}{extension}")
+    return paths
+
+
+def make_runner_tarball(path, files, large_files, large_mb):
+    """Write a ``.tar.gz`` runner; returns ``(files, uncompressed_bytes)``.
+
+    Small files are 0.5-32 KiB and half random, so the archive compresses
+    about as well as a real build.
+    """
+    rng = random.Random(files)
+    total = 0
+    count = 0
+
+    def add(tar, name, data, mode=0o644):
+        info = tarfile.TarInfo(f"{RUNNER_VERSION}/{name}")
+        info.size = len(data)
+        info.mode = mode
+        info.mtime = 0
+        tar.addfile(info, io.BytesIO(data))
+
+    with tarfile.open(path, "w:gz", compresslevel=1) as tar:
+        for name in _runner_paths(files):
+            size = int(rng.triangular(512, 32 * 1024, 2048))
+            data = rng.randbytes(size // 2) + bytes(size - size // 2)
+            if name.startswith("files/bin/") or name == "proton":
+                data = b"#!/bin/sh\nexit 0\n"
+            add(tar, name, data)
+            total += len(data)
+            count += 1
+        for i in range(large_files):
+            data = rng.randbytes(large_mb * MB // 2) + bytes(large_mb * MB - large_mb * MB // 2)
+            add(tar, f"files/lib/wine/x86_64-unix/large{i}.so", data)
+            total += len(data)
+            count += 1
+    return count, total
+
+
+def make_releases(count, base_url, archive):
+    """A GitHub ``/releases`` page: per release one runner tarball, its
+    checksum and the author/uploader noise the real payload carries."""
+    user = {"login": "bench", "id": 1, "type": "User", "site_admin": False,
+            "avatar_url": f"{base_url}/avatars/1", "html_url": f"{base_url}/bench"}
+    releases = []
+    for i in range(count):
+        tag = f"GE-Proton9-{count - i}"
+        assets = []
+        for name in (f"{tag}.tar.gz", f"{tag}.sha512sum"):
+            assets.append({"name": name, "size": archive["bytes"] if name.endswith(".tar.gz") else 140,
+                           "content_type": "application/octet-stream", "state": "uploaded",
+                           "download_count": 1000 + i, "uploader": user,
+                           "browser_download_url": f"{base_url}/assets/{i}/{name}"})
+        releases.append({"tag_name": tag, "name": tag, "draft": False, "prerelease": False,
+                         "created_at": "2024-01-01T00:00:00Z", "author": user,
+                         "body": "## Changes\n" + "\n".join(f"- fix {j} for game {i}" for j in range(40)),
+                         "assets": assets})
+    return releases
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, every
+    # response would wait for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path.split("?")[0].endswith("/releases"):
+            self._send(server.releases, "application/json")
+        elif self.path.split("?")[0].endswith(".sha512sum"):
+            self._send(server.checksum, "text/plain")
+        elif self.path.startswith("/assets/"):
+            size = os.path.getsize(server.archive)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            with open(server.archive, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, MB)
+        else:
+            self.send_error(404)
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def release_server(releases, archive):
+    """Local stand-in for api.github.com and the release asset host."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    server.releases = json.dumps(make_releases(releases, base_url, archive)).encode()
+    server.archive = archive["path"]
+    server.checksum = f"{archive['sha512']}  {os.path.basename(archive['path'])}\n".encode()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield base_url, len(server.releases)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def runner_archive(scale, fixtures_dir):
+    """The scale's runner tarball, generated by the first case that needs it."""
+    name = f"{RUNNER_VERSION}-{scale['files']}-{scale['large_files']}x{scale['large_mb']}"
+    path = os.path.join(fixtures_dir, name + ".tar.gz")
+    info_path = os.path.join(fixtures_dir, name + ".json")
+    if os.path.exists(info_path):
+        return benchlib.load_json(info_path)
+
+    from skcore.cache import hash_file
+
+    files, unpacked = make_runner_tarball(path, scale["files"], scale["large_files"], scale["large_mb"])
+    info = {"path": path, "files": files, "unpacked_bytes": unpacked,
+            "bytes": os.path.getsize(path), "sha512": hash_file(path, "sha512")}
+    benchlib.write_json(info_path, info)
+    return info
+
+
+def _rate(amount, seconds):
+    return amount / seconds if seconds > 0 else 0.0
+
+
+# -- Cases ---------------------------------------------------------------------
+
+def bench_database(scale, fixtures_dir):
+    from skcore import database
+
+    games = make_games(scale["records"])
+    save = benchlib.timed(lambda: database.save_games(games), repeat=scale["repeat"])
+    size = os.path.getsize(database.DB_PATH)
+    loaded = []
+    load = benchlib.timed(lambda: loaded.append(database.load_games()), repeat=scale["repeat"])
+    if len(loaded[-1]) != len(games):
+        raise AssertionError(f"saved {len(games)} games, loaded {len(loaded[-1])}")
+    return {"records": len(games), "file_bytes": size,
+            "save": save, "save_records_per_s": _rate(len(games), save["median_s"]),
+            "save_mb_per_s": _rate(size / MB, save["median_s"]),
+            "load": load, "load_records_per_s": _rate(len(games), load["median_s"]),
+            "load_mb_per_s": _rate(size / MB, load["median_s"])}
+
+
+def bench_runner_versions(scale, fixtures_dir):
+    from skcore import runners
+
+    archive = runner_archive(scale, fixtures_dir)
+    with release_server(scale["releases"], archive) as (base_url, payload):
+        original, runners.GITHUB_API = runners.GITHUB_API, base_url
+        try:
+            versions = []
+            timing = benchlib.timed(lambda: versions.append(runners.get_runner_versions("Proton")),
+                                    repeat=VERSION_CALLS)
+        finally:
+            runners.GITHUB_API = original
+    if len(versions[-1]) != scale["releases"]:
+        raise AssertionError(f"parsed {len(versions[-1])} of {scale['releases']} releases")
+    return {"releases": scale["releases"], "payload_bytes": payload, "fetch_and_parse": timing,
+            "releases_per_s": _rate(scale["releases"], timing["median_s"])}
+
+
+def bench_download(scale, fixtures_dir):
+    """Download, checksum verification and cache store through the real
+    download queue worker path, against the local server."""
+    from skcore.cache import get_archive_cache
+    from skcore.downloads import DownloadJob, DownloadManager
+
+    archive = runner_archive(scale, fixtures_dir)
+    manager = DownloadManager()
+    filename = os.path.basename(archive["path"])
+    samples = []
+    with release_server(1, archive) as (base_url, _):
+        for i in range(scale["repeat"]):
+            url = f"{base_url}/assets/0/{filename}"
+            job = DownloadJob(f"{url}?run={i}", filename, size=archive["bytes"], use_cache=False,
+                              checksum_url=f"{base_url}/assets/0/{RUNNER_VERSION}.sha512sum")
+            start = time.perf_counter()
+            manager._fetch(job)
+            samples.append(time.perf_counter() - start)
+            get_archive_cache().discard(job.cache_url)
+    timing = benchlib.summarize(samples)
+    return {"archive_bytes": archive["bytes"], "download": timing,
+            "mb_per_s": _rate(archive["bytes"] / MB, timing["median_s"])}
+
+
+def bench_extract(scale, fixtures_dir):
+    from skcore.installer import extract_runner
+    from skcore.runners import RUNNERS_DIR, set_executable_permissions
+
+    archive = runner_archive(scale, fixtures_dir)
+    version_dir = os.path.join(RUNNERS_DIR, "proton", RUNNER_VERSION)
+    extract = benchlib.timed(lambda: extract_runner(archive["path"], version_dir), repeat=scale["repeat"],
+                             setup=lambda: shutil.rmtree(version_dir, ignore_errors=True))
+    permissions = benchlib.timed(lambda: set_executable_permissions(version_dir), repeat=scale["repeat"])
+    wine = os.path.join(version_dir, RUNNER_VERSION, "files", "bin", "wine")
+    if not os.access(wine, os.X_OK):
+        raise AssertionError(f"{wine} is not executable after extraction")
+    return {"files": archive["files"], "archive_bytes": archive["bytes"],
+            "unpacked_bytes": archive["unpacked_bytes"],
+            "extract": extract, "files_per_s": _rate(archive["files"], extract["median_s"]),
+            "mb_per_s": _rate(archive["unpacked_bytes"] / MB, extract["median_s"]),
+            "permissions": permissions,
+            "permissions_files_per_s": _rate(archive["files"], permissions["median_s"])}
+
+
+def _install_fake_runners():
+    """Minimal Wine and Proton installs where get_runner_executable looks."""
+    from skcore.runners import RUNNERS_DIR
+
+    layouts = {"wine": ("bin/wine", "bin/wineserver"),
+               "proton": ("proton", "files/bin/wine", "files/bin/wineserver")}
+    for runner_type, files in layouts.items():
+        for name in files:
+            path = os.path.join(RUNNERS_DIR, runner_type, RUNNER_VERSION, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("#!/bin/sh\nexit 0\n")
+            os.chmod(path, 0o755)
+
+
+def bench_launch_env(scale, fixtures_dir):
+    from skcore.launcher import prepare_launch
+
+    _install_fake_runners()
+    exe = os.path.abspath("Game.exe")
+    with open(exe, "wb") as f:
+        f.write(b"MZ")
+
+    variants = {"system": ({"runner_type": "System"}, False),
+                "wine": ({"runner_type": "Wine"}, False),
+                "proton": ({"runner_type": "Proton"}, False),
+                "proton_script": ({"runner_type": "Proton"}, True)}
+    result = {"environment_variables": len(os.environ)}
+    for label, (runner, use_script) in variants.items():
+        game = dict(name=f"Launch Bench {label}", path=exe, runner_version=RUNNER_VERSION, **runner)
+        plan, error = prepare_launch(game, use_script)
+        if plan is None:
+            raise AssertionError(f"{label}: {error}")
+        timing = benchlib.timed(lambda: prepare_launch(game, use_script), repeat=LAUNCH_CALLS)
+        result[label] = dict(timing, launches_per_s=_rate(1, timing["median_s"]))
+    return result
+
+
+BENCHMARKS = {"database": bench_database, "runner_versions": bench_runner_versions,
+              "download": bench_download, "extract": bench_extract, "launch_env": bench_launch_env}
+
+
+def run_case(case, fixtures_dir):
+    scale_name, name = case.split("/")
+    with workspace():
+        result = BENCHMARKS[name](SCALES[scale_name], fixtures_dir)
+    result["peak_rss_bytes"] = benchlib.peak_rss_bytes()
+    print(json.dumps(result), flush=True)
+    # Skip interpreter teardown: PySide6 6.12 on Python 3.11 over-releases
+    # objects (Signal.emit, QProcessEnvironment built as the launcher does)
+    # and aborts while finalizing, after the numbers are already out.
+    os._exit(0)
+
+
+def run_cases(names, scale_name, timeout=benchlib.DEFAULT_CASE_TIMEOUT_S):
+    """Each case in its own interpreter, so peak RSS is per case and a
+    crashing case cannot take the rest of the run with it."""
+    fixtures_dir = shared_fixtures_dir()
+    cases = {}
+    for name in names:
+        case = f"{scale_name}/{name}"
+        print(f"running {case}...", file=sys.stderr)
+        cases[case] = benchlib.run_isolated(os.path.abspath(__file__), case,
+                                            ("--fixtures", fixtures_dir), timeout=timeout)
+    return cases
+
+
+# -- pytest entry points -------------------------------------------------------
+
+def _check(name):
+    scale = os.environ.get("SK_BENCH_SCALE", "small")
+    key = f"{scale}/{name}"
+    case = run_cases([name], scale)[key]
+    assert "error" not in case, case["error"]
+    baseline = os.environ.get("SK_BENCH_BASELINE")
+    if baseline:
+        tolerance = float(os.environ.get("SK_BENCH_TOLERANCE", benchlib.DEFAULT_TOLERANCE))
+        regressions = benchlib.compare({"cases": {key: case}}, benchlib.load_json(baseline), tolerance)
+        assert not regressions, "\n".join(benchlib.format_regressions(regressions))
+    return case
+
+
+def test_database():
+    _check("database")
+
+
+def test_runner_versions():
+    _check("runner_versions")
+
+
+def test_download():
+    _check("download")
+
+
+def test_extract():
+    _check("extract")
+
+
+def test_launch_env():
+    _check("launch_env")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scale", choices=tuple(SCALES), default="default",
+                        help="fixture sizes: " + "; ".join(
+                            f"{name}: {s['records']} games, {s['files']} files + {s['large_files']}x{s['large_mb']} MB"
+                            for name, s in SCALES.items()))
+    parser.add_argument("--cases", default=",".join(CASES), help=f"comma-separated subset of {','.join(CASES)}")
+    parser.add_argument("--case-timeout", type=int, default=benchlib.DEFAULT_CASE_TIMEOUT_S,
+                        help="seconds before a case is abandoned and reported as failed")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--fixtures", help=argparse.SUPPRESS)
+    benchlib.add_common_arguments(parser)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.fixtures)
+        return 0
+
+    names = [n.strip() for n in args.cases.split(",") if n.strip()]
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    return benchlib.report("backend", run_cases(names, args.scale, args.case_timeout), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Headless benchmarks for the UI hot paths.
+
+    QT_QPA_PLATFORM=offscreen python scripts/bench_ui.py --save-baseline data/bench/ui-baseline.json
+    QT_QPA_PLATFORM=offscreen python scripts/bench_ui.py --baseline data/bench/ui-baseline.json
+
+Each case (library size x with/without banner files) runs in its own
+interpreter inside a throwaway working directory, so peak RSS is per case
+and the real data/ folder is never touched. Every game gets a card
+widget, so 10k and 50k libraries take a long time per case; they run only
+when asked for with ``--sizes``.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchlib
+
+sys.path.insert(0, benchlib.ROOT)
+
+DEFAULT_SIZES = (100, 1000)
+ALL_SIZES = (100, 1000, 10000, 50000)
+UNIQUE_BANNERS = 256
+WIDE_EVERY = 10
+SELECT_SAMPLES = 50
+LARGE_LIBRARY = 10000
+CARD_PAINTS = 200
+WORDS = ("Shadow", "Crystal", "Iron", "Last", "Neon", "Frozen", "Silent", "Crimson", "Star", "Lost",
+         "Kingdom", "Drift", "Legacy", "Protocol", "Horizon", "Echo", "Rift", "Harbor", "Engine", "Saga")
+
+
+def make_banners(directory, count):
+    """Write ``count`` distinct long (600x900) and wide (1920x620) JPEGs."""
+    from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {"long": [], "wide": []}
+    for kind, (w, h) in (("long", (600, 900)), ("wide", (1920, 620))):
+        for i in range(count):
+            image = QImage(w, h, QImage.Format_RGB32)
+            painter = QPainter(image)
+            gradient = QLinearGradient(0, 0, w, h)
+            gradient.setColorAt(0, QColor.fromHsv((i * 37) % 360, 200, 200))
+            gradient.setColorAt(1, QColor.fromHsv((i * 91 + 120) % 360, 160, 60))
+            painter.fillRect(image.rect(), gradient)
+            painter.end()
+            path = os.path.join(directory, f"{kind}-{i}.jpg")
+            image.save(path, "JPG", 85)
+            paths[kind].append(path)
+    return paths
+
+
+def make_library(size, banners, workdir):
+    exe = os.path.join(workdir, "game.exe")
+    with open(exe, "wb") as f:
+        f.write(b"MZ")
+    files = make_banners(os.path.join(workdir, "bench-banners"), min(size, UNIQUE_BANNERS)) if banners else None
+
+    games = []
+    for i in range(size):
+        kind = "wide" if i % WIDE_EVERY == 0 else "long"
+        name = f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7 + 3) % len(WORDS)]} {i}"
+        games.append({
+            "name": name,
+            "path": exe,
+            "banner": files[kind][i % len(files[kind])] if files else "",
+            "banner_type": kind,
+            "version": f"1.{i % 10}",
+            "runner_type": ("System", "Wine", "Proton")[i % 3],
+            "runner_version": "",
+            "description": f"Synthetic game number {i} for benchmarking.",
+        })
+    return games
+
+
+def drain(app, until, timeout=600):
+    deadline = time.monotonic() + timeout
+    while not until():
+        if time.monotonic() > deadline:
+            raise TimeoutError("UI did not settle")
+        app.processEvents()
+
+
+def flush_deletes(app):
+    from PySide6.QtCore import QCoreApplication, QEvent
+
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def run_case(case):
+    size, banners = case.split(":")
+    size, banners = int(size), banners == "banners"
+
+    large = size >= LARGE_LIBRARY
+    workdir = tempfile.mkdtemp(prefix="sk-bench-ui-")
+    os.chdir(workdir)
+    os.makedirs("data", exist_ok=True)
+    with open(os.path.join("data", "settings.json"), "w") as f:
+        json.dump({"check_updates": False}, f)
+    games = make_library(size, banners, workdir)
+    with open(os.path.join("data", "games.json"), "w") as f:
+        json.dump(games, f)
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QPixmap
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from skui.main_window import MainWindow
+    from skui.game_card import GameCard, RoundedLabel
+    from skui.image_cache import get_pixmap_cache
+
+    result = {"games": size, "banners": banners}
+
+    # Shell construction, then until every card of the incremental grid exists.
+    start = time.perf_counter()
+    window = MainWindow()
+    result["construct_s"] = time.perf_counter() - start
+    window.show()
+    drain(app, lambda: len(window.cards) == size and window.library_index.games)
+    result["startup_to_populated_s"] = time.perf_counter() - start
+    result["widgets"] = len(QApplication.allWidgets())
+
+    result["refresh_grid"] = benchlib.timed(window.refresh_grid, repeat=3 if large else 5,
+                                            setup=lambda: flush_deletes(app))
+    flush_deletes(app)
+    result["widgets_after_refresh"] = len(QApplication.allWidgets())
+
+    count = SELECT_SAMPLES // 5 if large else SELECT_SAMPLES
+    step = max(1, len(window.cards) // count)
+    samples = []
+    for card in window.cards[::step][:count]:
+        t = time.perf_counter()
+        window.on_select(card)
+        samples.append(time.perf_counter() - t)
+    result["on_select"] = benchlib.summarize(samples)
+
+    result["apply_theme"] = benchlib.timed(window.apply_theme, repeat=3 if large else 5)
+
+    # Scroll the grid a viewport at a time and paint each position synchronously;
+    # with a cold cache this is the GUI-thread cost, the decodes run behind it.
+    bar = window.scroll.horizontalScrollBar()
+    viewport = window.scroll.viewport()
+    positions = range(bar.minimum(), bar.maximum() + 1, max(1, viewport.width() // 2))
+    get_pixmap_cache().clear()
+    samples = []
+    for value in positions:
+        bar.setValue(value)
+        t = time.perf_counter()
+        viewport.repaint()
+        samples.append(time.perf_counter() - t)
+    result["scroll_paint"] = dict(benchlib.summarize(samples), frames=len(samples))
+
+    # A single card rendered offscreen. A miss paints a placeholder and decodes
+    # on the task executor; the rest hit the cache.
+    game = next((g for g in games if g["banner"] and g["banner_type"] == "long"), games[0])
+    card = GameCard(game, lambda c: None)
+    target = QPixmap(card.size())
+    cache = get_pixmap_cache()
+    cache.clear()
+    t = time.perf_counter()
+    card.render(target)
+    result["card_paint_cold_s"] = time.perf_counter() - t
+    if isinstance(card.img_lbl, RoundedLabel):
+        drain(app, lambda: not cache.stats()["pending"])
+        result["card_decode_s"] = time.perf_counter() - t
+    result["card_paint_warm"] = benchlib.timed(lambda: card.render(target), repeat=CARD_PAINTS)
+
+    if isinstance(card.img_lbl, RoundedLabel):
+        label_target = QPixmap(card.img_lbl.size())
+        result["rounded_label_paint"] = benchlib.timed(lambda: card.img_lbl.render(label_target), repeat=CARD_PAINTS)
+
+    result["pixmap_cache"] = get_pixmap_cache().stats()
+    result["peak_rss_bytes"] = benchlib.peak_rss_bytes()
+    print(json.dumps(result))
+    os.chdir(benchlib.ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help=f"comma-separated library sizes (default {','.join(map(str, DEFAULT_SIZES))}; "
+                             f"all: {','.join(map(str, ALL_SIZES))})")
+    parser.add_argument("--banners", choices=("both", "with", "without"), default="both")
+    parser.add_argument("--case-timeout", type=int, default=benchlib.DEFAULT_CASE_TIMEOUT_S,
+                        help="seconds before a case is abandoned and reported as failed")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    benchlib.add_common_arguments(parser)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case)
+        return 0
+
+    modes = {"both": ("banners", "plain"), "with": ("banners",), "without": ("plain",)}[args.banners]
+    cases = {}
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        for mode in modes:
+            name = f"{size}-{mode}"
+            print(f"running {name}...", file=sys.stderr)
+            cases[name] = benchlib.run_isolated(os.path.abspath(__file__), f"{size}:{mode}",
+                                                timeout=args.case_timeout)
+    return benchlib.report("ui", cases, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Shared helpers for the benchmark scripts: timing stats, peak RSS, JSON
+reports and comparison against a stored baseline."""
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TOLERANCE = 0.20
+DEFAULT_CASE_TIMEOUT_S = 1800
+
+# Metric name suffixes that get compared: rates (higher is better) and
+# costs (lower is better). Rates are checked first since "_per_s" ends in "_s".
+RATE_SUFFIXES = ("_per_s",)
+COST_SUFFIXES = ("_s", "_ms", "_bytes")
+
+
+def timed(fn, repeat=5, setup=None):
+    """Run ``fn`` ``repeat`` times and summarise the wall times in seconds."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return {"median_s": statistics.median(samples), "p95_s": p95, "min_s": samples[0], "n": len(samples)}
+
+
+def peak_rss_bytes():
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def environment():
+    from PySide6 import __version__ as pyside_version
+    from PySide6.QtCore import qVersion
+
+    return {"python": platform.python_version(), "pyside": pyside_version, "qt": qVersion(),
+            "machine": platform.machine(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def run_isolated(script, case, extra_args=(), timeout=DEFAULT_CASE_TIMEOUT_S):
+    """Run one case in a fresh interpreter so its peak RSS is its own."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    try:
+        proc = subprocess.run([sys.executable, script, "--case", case, *extra_args],
+                              capture_output=True, text=True, env=env, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": [f"timed out after {timeout} s"]}
+    # The case prints its JSON as the last line; Qt may print warnings before it.
+    lines = proc.stdout.strip().splitlines()
+    try:
+        result = json.loads(lines[-1])
+    except (IndexError, ValueError):
+        output = (proc.stderr or proc.stdout or f"exit status {proc.returncode}").strip().splitlines()
+        # A fatal error names itself on the first lines, a traceback on the last.
+        return {"error": output if len(output) <= 20 else output[:3] + ["..."] + output[-16:]}
+    if proc.returncode != 0:
+        # Measured, then crashed (e.g. during interpreter teardown). The numbers
+        # are kept for inspection, but a process that aborts is a failed case.
+        stderr = proc.stderr.strip().splitlines()
+        result["error"] = [f"exited with status {proc.returncode} after reporting"] + [l for l in stderr[:3] if l.strip()]
+    return result
+
+
+def flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions beyond ``tolerance``: costs (times, bytes) that grew and
+    rates (MB/s, files/s) that dropped.
+
+    Returns ``[(metric, baseline, current, ratio)]`` where ``ratio`` is how
+    many times worse; metrics missing on either side are skipped, so adding
+    a case never fails a comparison.
+    """
+    now = flatten(current.get("cases", {}))
+    then = flatten(baseline.get("cases", {}))
+    regressions = []
+    for name, old in then.items():
+        new = now.get(name)
+        if new is None or old <= 0 or name.endswith(".min_s"):
+            continue
+        if name.endswith(RATE_SUFFIXES):
+            ratio = old / new if new > 0 else float("inf")
+        elif name.endswith(COST_SUFFIXES):
+            ratio = new / old
+        else:
+            continue
+        if ratio > 1 + tolerance:
+            regressions.append((name, old, new, ratio))
+    return regressions
+
+
+def load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def report(suite, cases, args):
+    """Write/print the suite result, compare with ``--baseline``; returns the exit code."""
+    result = {"suite": suite, "timestamp": time.time(), "environment": environment(), "cases": cases}
+    text = json.dumps(result, indent=2)
+    if args.output:
+        write_json(args.output, result)
+    else:
+        print(text)
+    if args.save_baseline:
+        write_json(args.save_baseline, result)
+
+    failed = [name for name, case in cases.items() if "error" in case]
+    for name in failed:
+        print(f"{name}: FAILED\n  " + "\n  ".join(cases[name]["error"]), file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(result, load_json(args.baseline), args.tolerance)
+        for line in format_regressions(regressions):
+            print(line, file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def format_regressions(regressions):
+    return [f"REGRESSION {name}: {old:.6g} -> {new:.6g} ({(new / old - 1) * 100:+.0f}%)"
+            for name, old, new, _ in regressions]
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="compare against this earlier report; exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="also store this run as a baseline file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a metric counts as a regression (default 0.20)")
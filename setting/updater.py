@@ -1,11 +1,18 @@
-import requests
 import os
 import sys
+import posixpath
+import json
+import time
 import shutil
+import hashlib
 import zipfile
-import io
+import zlib
 from PySide6.QtWidgets import QMessageBox
-from skcore.config import load_settings
+from PySide6.QtCore import QObject, Signal, Slot
+from skcore import net
+from skcore.config import get_settings_service
+from skcore.downloads import DownloadJob, get_download_manager, PRIORITY_NORMAL, CANCELLED
+from skcore.tasks import get_task_executor
 
 GITHUB_USER = "Khalilw5556"
 GITHUB_REPO = "sk-player-launcher"
@@ -13,95 +20,388 @@ BRANCH = "main"
 
 VERSION_URL = f"https://raw.githubusercontent.com/{GITHUB_USER}/{GITHUB_REPO}/{BRANCH}/version.txt"
 ZIP_URL = f"https://github.com/{GITHUB_USER}/{GITHUB_REPO}/archive/refs/heads/{BRANCH}.zip"
-IGNORED_DIRS = ["data", ".git", "__pycache__", "venv", ".idea"]
+MANIFEST_NAME = ".sk_manifest.json"
+STAGING_DIR = ".update_staging"
+BACKUP_DIR = ".update_backup"
+IGNORED_DIRS = ["data", ".git", "__pycache__", "venv", ".idea", MANIFEST_NAME, STAGING_DIR, BACKUP_DIR]
 CURRENT_VERSION = "1.0"
 
+UPDATE_CACHE_FILE = os.path.join("data", "cache", "update_check.json")
+UPDATE_CHECK_TTL = 6 * 60 * 60
+
 
 def get_project_root():
     current_dir = os.path.dirname(os.path.abspath(__file__))
     return os.path.dirname(current_dir)
 
 
-def manual_check(parent_widget=None):
-    settings = load_settings()
-    if settings.get("developer_mode", False):
-        QMessageBox.information(
+def updates_disabled():
+    return get_settings_service().get("developer_mode", False)
+
+
+class UpdateChecker(QObject):
+    """Fetches version.txt on the task executor.
+
+    Results are cached in ``data/cache/update_check.json`` for
+    ``UPDATE_CHECK_TTL`` seconds and refreshed with a conditional request, so a
+    repeat check is usually a 304 or no request at all.
+    """
+
+    finished = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._running = False
+
+    def load_cache(self):
+        if not os.path.exists(UPDATE_CACHE_FILE):
+            return {}
+        try:
+            with open(UPDATE_CACHE_FILE, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save_cache(self, data):
+        try:
+            os.makedirs(os.path.dirname(UPDATE_CACHE_FILE), exist_ok=True)
+            with open(UPDATE_CACHE_FILE, "w") as f:
+                json.dump(data, f, indent=4)
+        except OSError as e:
+            print(f"Update cache error: {e}")
+
+    def is_running(self):
+        return self._running
+
+    def check(self, force=False):
+        if self._running:
+            return
+        self._running = True
+        get_task_executor().submit(self._run, force, on_done=self._deliver, on_error=self._failed)
+
+    def _deliver(self, result):
+        self._running = False
+        self.finished.emit(result)
+
+    def _failed(self, error):
+        self._deliver(self._result(None, error=f"Failed to check for updates:\n{error}"))
+
+    def _run(self, force):
+        cache = self.load_cache()
+        fresh = time.time() - cache.get("checked_at", 0) < UPDATE_CHECK_TTL
+
+        if fresh and not force and cache.get("latest"):
+            return self._result(cache["latest"], cached=True)
+
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+        try:
+            response = net.get(VERSION_URL, headers=headers, timeout=(5, 5))
+            if response.status_code == 304 and cache.get("latest"):
+                latest = cache["latest"]
+            elif response.status_code == 200:
+                latest = response.text.strip()
+                cache["etag"] = response.headers.get("ETag", "")
+                cache["last_modified"] = response.headers.get("Last-Modified", "")
+            else:
+                return self._result(None, error="Could not fetch version info from GitHub.")
+        except Exception as e:
+            return self._result(None, error=f"Failed to check for updates:\n{str(e)}")
+
+        cache.update({"latest": latest, "checked_at": time.time()})
+        self.save_cache(cache)
+        return self._result(latest)
+
+    def _result(self, latest, error="", cached=False):
+        return {"latest": latest, "current": CURRENT_VERSION, "error": error, "cached": cached,
+                "available": bool(latest) and latest != CURRENT_VERSION}
+
+
+_checker = None
+
+
+def get_update_checker():
+    global _checker
+    if _checker is None:
+        _checker = UpdateChecker()
+    return _checker
+
+
+def show_update_result(parent_widget, result):
+    if result["error"]:
+        QMessageBox.warning(parent_widget, "Error", result["error"])
+    elif result["available"]:
+        reply = QMessageBox.question(
             parent_widget,
-            "Developer Mode",
-            "Developer Mode is ACTIVE.\n\nUpdates are disabled to protect your local changes."
+            "Update Available",
+            f"A new version ({result['latest']}) is available.\nDo you want to update now?",
+            QMessageBox.Yes | QMessageBox.No
         )
-        return
 
-    try:
-        response = requests.get(VERSION_URL, timeout=5)
-        if response.status_code == 200:
-            latest_version = response.text.strip()
-
-            if latest_version != CURRENT_VERSION:
-                reply = QMessageBox.question(
-                    parent_widget,
-                    "Update Available",
-                    f"A new version ({latest_version}) is available.\nDo you want to update now?",
-                    QMessageBox.Yes | QMessageBox.No
-                )
-
-                if reply == QMessageBox.Yes:
-                    download_and_install(parent_widget)
-            else:
-                QMessageBox.information(parent_widget, "Up to Date",
-                                        f"You are using the latest version ({CURRENT_VERSION}).")
-        else:
-            QMessageBox.warning(parent_widget, "Error", "Could not fetch version info from GitHub.")
+        if reply == QMessageBox.Yes:
+            download_and_install(parent_widget, result["latest"])
+    else:
+        QMessageBox.information(parent_widget, "Up to Date",
+                                f"You are using the latest version ({CURRENT_VERSION}).")
 
-    except Exception as e:
-        QMessageBox.critical(parent_widget, "Error", f"Failed to check for updates:\n{str(e)}")
 
+class UpdateInstaller(QObject):
+    """Runs an update download through the shared download manager and
+    reports back on the GUI thread."""
 
-def download_and_install(parent_widget=None):
-    if parent_widget:
-        parent_widget.setDisabled(True)
+    def __init__(self, parent_widget=None, version=None):
+        super().__init__(parent_widget)
+        self.parent_widget = parent_widget
+        self.manager = get_download_manager()
+        self.manager.job_finished.connect(self.on_job_finished)
+        self.manager.job_failed.connect(self.on_job_failed)
+        self.manager.job_state.connect(self.on_job_state)
 
-    try:
-        r = requests.get(ZIP_URL)
-        if r.status_code == 200:
-            z = zipfile.ZipFile(io.BytesIO(r.content))
-            root_dir = get_project_root()
-            extract_path = os.path.join(root_dir, "temp_update")
+        cache_url = f"{ZIP_URL}#{version}" if version else None
+        self.job = DownloadJob(ZIP_URL, f"{GITHUB_REPO}-{BRANCH}.zip", priority=PRIORITY_NORMAL,
+                               cache_url=cache_url, use_cache=bool(version),
+                               then=self.extract_and_apply, label="update")
+
+    def start(self):
+        if self.parent_widget:
+            self.parent_widget.setDisabled(True)
+        self.manager.submit(self.job)
+
+    def extract_and_apply(self, job, archive_path):
+        self.manager.set_status(job, "Applying update...")
+        apply_update(archive_path, get_project_root())
+
+    @Slot(str, str)
+    def on_job_finished(self, job_id, path):
+        if job_id != self.job.id:
+            return
+        QMessageBox.information(self.parent_widget, "Success", "Update completed! The app will restart.")
+        restart_app()
+
+    @Slot(str, str)
+    def on_job_failed(self, job_id, error_msg):
+        if job_id != self.job.id:
+            return
+        if self.parent_widget: self.parent_widget.setDisabled(False)
+        QMessageBox.critical(self.parent_widget, "Update Failed", f"An error occurred:\n{error_msg}")
+
+    @Slot(str, str)
+    def on_job_state(self, job_id, state):
+        if job_id == self.job.id and state == CANCELLED:
+            if self.parent_widget: self.parent_widget.setDisabled(False)
 
-            z.extractall(extract_path)
 
-            extracted_folder_name = f"{GITHUB_REPO}-{BRANCH}"
-            source_dir = os.path.join(extract_path, extracted_folder_name)
+_active_installer = None
 
-            apply_update(source_dir, root_dir)
 
-            shutil.rmtree(extract_path)
+def download_and_install(parent_widget=None, version=None):
+    global _active_installer
+    _active_installer = UpdateInstaller(parent_widget, version)
+    _active_installer.start()
+    return _active_installer
 
-            QMessageBox.information(parent_widget, "Success", "Update completed! The app will restart.")
-            restart_app()
-        else:
-            QMessageBox.warning(parent_widget, "Failed", "Failed to download update file.")
-            if parent_widget: parent_widget.setDisabled(False)
 
-    except Exception as e:
-        if parent_widget: parent_widget.setDisabled(False)
-        QMessageBox.critical(parent_widget, "Update Failed", f"An error occurred:\n{str(e)}")
+def _is_ignored(rel_path):
+    return any(part in IGNORED_DIRS for part in rel_path.split("/"))
 
 
-def apply_update(source, target):
-    for item in os.listdir(source):
-        if item in IGNORED_DIRS:
+def _safe_rel(rel):
+    """Normalize an archive or manifest path. Raises ValueError for absolute
+    paths and paths that climb out of the install dir."""
+    norm = posixpath.normpath(rel.replace("\\", "/"))
+    if posixpath.isabs(norm) or os.path.isabs(norm) or os.path.splitdrive(norm)[0] \
+            or norm in (".", "..") or norm.startswith("../"):
+        raise ValueError(f"Unsafe path in update: {rel!r}")
+    return norm
+
+
+def _inside(base, rel):
+    """Join ``rel`` onto ``base``, refusing anything that lands outside ``base``."""
+    base = os.path.abspath(base)
+    dest = os.path.abspath(os.path.join(base, _safe_rel(rel)))
+    if os.path.commonpath([base, dest]) != base or dest == base:
+        raise ValueError(f"Unsafe path in update: {rel!r}")
+    return dest
+
+
+def _hash_file(path):
+    sha = hashlib.sha256()
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+    return {"size": os.path.getsize(path), "crc": crc, "sha256": sha.hexdigest()}
+
+
+def build_local_manifest(root):
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        if rel_dir != "." and _is_ignored(rel_dir):
+            dirnames[:] = []
             continue
+        for name in filenames:
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if not _is_ignored(rel):
+                manifest[rel] = _hash_file(os.path.join(dirpath, name))
+    return manifest
+
+
+def load_local_manifest(root):
+    """Return ``(manifest, tracked)``. ``tracked`` is False when the manifest had
+    to be rebuilt from disk, in which case it may include files we never shipped."""
+    path = os.path.join(root, MANIFEST_NAME)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f), True
+        except (json.JSONDecodeError, IOError):
+            pass
+    return build_local_manifest(root), False
+
+
+def stage_update(archive_path, root):
+    """Extract only files whose size/CRC differ from the local manifest.
+
+    Returns ``(changed, removed, new_manifest)`` with paths relative to root.
+    """
+    staging = os.path.join(root, STAGING_DIR)
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+
+    local, tracked = load_local_manifest(root)
+    prefix = f"{GITHUB_REPO}-{BRANCH}/"
+    new_manifest, changed = {}, []
+
+    with zipfile.ZipFile(archive_path) as z:
+        for info in z.infolist():
+            if info.is_dir() or not info.filename.startswith(prefix):
+                continue
+            rel = info.filename[len(prefix):]
+            if not rel:
+                continue
+            rel = _safe_rel(rel)
+            if _is_ignored(rel):
+                continue
+
+            old = local.get(rel)
+            if old and old["size"] == info.file_size and old["crc"] == info.CRC \
+                    and os.path.exists(_inside(root, rel)):
+                new_manifest[rel] = old
+                continue
+
+            _inside(root, rel)
+            dest = _inside(staging, rel)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            sha = hashlib.sha256()
+            with z.open(info) as src, open(dest, "wb") as out:
+                for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                    sha.update(chunk)
+                    out.write(chunk)
+            new_manifest[rel] = {"size": info.file_size, "crc": info.CRC, "sha256": sha.hexdigest()}
+            changed.append(rel)
+
+    removed = [rel for rel in local if rel not in new_manifest] if tracked else []
+    for rel in removed:
+        _inside(root, rel)
+    return changed, removed, new_manifest
+
+
+def swap_in(root, changed, removed, new_manifest):
+    """Move staged files into place, keeping the replaced ones for rollback."""
+    staging = os.path.join(root, STAGING_DIR)
+    backup = os.path.join(root, BACKUP_DIR)
+    # Validate every path before touching the tree, so a bad entry can't leave
+    # a partial swap behind.
+    for rel in changed + removed:
+        _inside(root, rel)
+    for rel in changed:
+        _inside(staging, rel)
+
+    if os.path.exists(backup):
+        shutil.rmtree(backup)
+    os.makedirs(backup)
+
+    journal = {"version": CURRENT_VERSION, "changed": changed, "removed": removed,
+               "added": [rel for rel in changed if not os.path.exists(_inside(root, rel))]}
+    with open(os.path.join(backup, "journal.json"), "w") as f:
+        json.dump(journal, f, indent=4)
+
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        shutil.copy2(manifest_path, os.path.join(backup, MANIFEST_NAME))
+
+    try:
+        for rel in changed + removed:
+            live = _inside(root, rel)
+            if os.path.exists(live):
+                saved = _inside(os.path.join(backup, "files"), rel)
+                os.makedirs(os.path.dirname(saved), exist_ok=True)
+                os.replace(live, saved)
+
+        for rel in changed:
+            live = _inside(root, rel)
+            os.makedirs(os.path.dirname(live), exist_ok=True)
+            os.replace(_inside(staging, rel), live)
+
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(new_manifest, f, indent=4)
+        os.replace(tmp_path, manifest_path)
+    except Exception:
+        # Never leave a half-old, half-new tree: put back what was moved so far.
+        try:
+            rollback_update(root)
+        except Exception as e:
+            print(f"Update rollback error: {e}")
+        raise
+
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def apply_update(archive_path, root):
+    changed, removed, new_manifest = stage_update(archive_path, root)
+    swap_in(root, changed, removed, new_manifest)
+    return changed, removed
+
+
+def rollback_update(root=None):
+    """Restore the files replaced by the last update. Returns False if there is nothing to undo."""
+    root = root or get_project_root()
+    backup = os.path.join(root, BACKUP_DIR)
+    journal_path = os.path.join(backup, "journal.json")
+    if not os.path.exists(journal_path):
+        return False
+
+    with open(journal_path, "r") as f:
+        journal = json.load(f)
+
+    for rel in journal["added"]:
+        live = _inside(root, rel)
+        if os.path.exists(live):
+            os.remove(live)
+
+    for rel in journal["changed"] + journal["removed"]:
+        saved = _inside(os.path.join(backup, "files"), rel)
+        if os.path.exists(saved):
+            live = _inside(root, rel)
+            os.makedirs(os.path.dirname(live), exist_ok=True)
+            os.replace(saved, live)
 
-        s = os.path.join(source, item)
-        d = os.path.join(target, item)
+    saved_manifest = os.path.join(backup, MANIFEST_NAME)
+    if os.path.exists(saved_manifest):
+        os.replace(saved_manifest, os.path.join(root, MANIFEST_NAME))
+    elif os.path.exists(os.path.join(root, MANIFEST_NAME)):
+        os.remove(os.path.join(root, MANIFEST_NAME))
 
-        if os.path.isdir(s):
-            if os.path.exists(d):
-                shutil.rmtree(d)
-            shutil.copytree(s, d)
-        else:
-            shutil.copy2(s, d)
+    shutil.rmtree(backup)
+    return True
 
 
 def restart_app():
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PySide6.QtGui import QImage, QImageReader, QImageWriter
+
+BANNERS_DIR = os.path.join("data", "banners")
+INDEX_FILE = os.path.join(BANNERS_DIR, "index.json")
+
+# Card heights from GameCard; banners never need more pixels than this times the DPR.
+BANNER_HEIGHTS = {"wide": 160, "long": 260}
+JPEG_QUALITY = 88
+WEBP_QUALITY = 85
+# Filesystem timestamps lag time.time() by a clock tick; files this close to
+# a cleanup snapshot count as newer than it.
+CLEANUP_GRACE_S = 2
+
+_HASHED_NAME = re.compile(r"^[0-9a-f]{24}\.(webp|jpg|png)$")
+_index_lock = threading.Lock()
+
+
+def _load_index():
+    if not os.path.exists(INDEX_FILE):
+        return {}
+    try:
+        with open(INDEX_FILE, "r") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def _save_index(index):
+    tmp_path = INDEX_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=4)
+    os.replace(tmp_path, INDEX_FILE)
+
+
+def _pick_format(has_alpha):
+    supported = {bytes(f).decode() for f in QImageWriter.supportedImageFormats()}
+    if "webp" in supported:
+        return "webp", WEBP_QUALITY
+    if has_alpha:
+        return "png", -1
+    return "jpg", JPEG_QUALITY
+
+
+def target_height(banner_type, device_pixel_ratio=1.0):
+    return int(BANNER_HEIGHTS.get(banner_type, BANNER_HEIGHTS["long"]) * max(1.0, device_pixel_ratio))
+
+
+def ingest_banner(src_path, banner_type="long", device_pixel_ratio=1.0):
+    """Decode ``src_path`` once at card resolution, re-encode it compactly and
+    store it under its content hash. Safe to call off the GUI thread.
+
+    Returns the stored path, shared with any earlier import of the same image.
+    """
+    with open(src_path, "rb") as f:
+        raw = f.read()
+
+    height = target_height(banner_type, device_pixel_ratio)
+    source_key = f"{hashlib.sha256(raw).hexdigest()}:{height}"
+
+    with _index_lock:
+        index = _load_index()
+        known = index.get(source_key)
+        if known and os.path.exists(known):
+            # Handed out again: make it newer than any running cleanup's snapshot.
+            os.utime(known)
+            return known
+
+    buffer = QBuffer()
+    buffer.setData(QByteArray(raw))
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer)
+    reader.setAutoTransform(True)
+
+    size = reader.size()
+    if size.isValid() and size.height() > height:
+        reader.setScaledSize(QSize(max(1, round(size.width() * height / size.height())), height))
+
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Could not decode image: {reader.errorString()}")
+
+    if image.height() > height:
+        image = image.scaledToHeight(height, Qt.SmoothTransformation)
+
+    fmt, quality = _pick_format(image.hasAlphaChannel())
+    if fmt == "jpg":
+        image = image.convertToFormat(QImage.Format_RGB32)
+
+    out = QByteArray()
+    out_buffer = QBuffer(out)
+    out_buffer.open(QIODevice.WriteOnly)
+    if not image.save(out_buffer, fmt, quality):
+        raise ValueError(f"Could not encode banner as {fmt}")
+    encoded = bytes(out)
+
+    os.makedirs(BANNERS_DIR, exist_ok=True)
+    dest = os.path.join(BANNERS_DIR, f"{hashlib.sha256(encoded).hexdigest()[:24]}.{fmt}")
+    if not os.path.exists(dest):
+        tmp_path = dest + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, dest)
+
+    with _index_lock:
+        index = _load_index()
+        index[source_key] = dest
+        _save_index(index)
+    return dest
+
+
+def remove_unreferenced_banners(games, snapshot_time=None):
+    """Delete content-addressed banners no game points at. Legacy files are left alone.
+
+    ``games`` is a snapshot taken at ``snapshot_time``; files written or
+    handed out by ``ingest_banner`` after it are kept, since the game they
+    belong to may not point at them yet.
+    """
+    used = {os.path.normpath(g.get("banner", "")) for g in games if g.get("banner")}
+    cutoff = (snapshot_time or time.time()) - CLEANUP_GRACE_S
+    removed = []
+    try:
+        names = os.listdir(BANNERS_DIR)
+    except OSError:
+        return removed
+
+    # Under the index lock, so an ingest cannot hand out a file between the
+    # age check and the delete.
+    with _index_lock:
+        for name in names:
+            path = os.path.join(BANNERS_DIR, name)
+            if not _HASHED_NAME.match(name) or os.path.normpath(path) in used:
+                continue
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                print(f"Banner cleanup error: {e}")
+
+        if removed:
+            index = {k: v for k, v in _load_index().items() if v not in removed}
+            _save_index(index)
+    return removed
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from skcore.config import get_settings_service
+
+CACHE_DIR = os.path.abspath(os.path.join("data", "cache", "archives"))
+DEFAULT_BUDGET_MB = 4096
+
+
+def cache_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def hash_file(path, algo="sha256", chunk_size=1024 * 1024):
+    h = hashlib.new(algo)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ArchiveCache:
+    """Size-bounded LRU store for downloaded archives, keyed by source URL.
+
+    Entries remember their byte size and any known digests, so a lookup can
+    reject a file that was truncated or replaced behind our back.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, budget_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.budget_bytes = budget_bytes
+        self._lock = threading.RLock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, "r") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_file + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=4)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            print(f"Archive cache index error: {e}")
+
+    def path_for(self, url, filename=""):
+        name = cache_key(url)
+        if filename:
+            name = f"{name}-{os.path.basename(filename)}"
+        return os.path.join(self.cache_dir, name)
+
+    def partial_path(self, url):
+        return os.path.join(self.cache_dir, cache_key(url) + ".part")
+
+    def lookup(self, url, size=None, digests=None):
+        """Return the cached path for ``url`` or None.
+
+        ``digests`` maps hashlib algorithm names to expected hex digests. An
+        entry recorded without one of them is hashed once and the result kept.
+        """
+        key = cache_key(url)
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+
+            path = entry["path"]
+            try:
+                on_disk = os.path.getsize(path)
+            except OSError:
+                on_disk = -1
+
+            stale = on_disk != entry.get("size")
+            if size and entry.get("size") != size:
+                stale = True
+
+            known = entry.setdefault("digests", {})
+            for algo, expected in (digests or {}).items():
+                if stale:
+                    break
+                if algo not in known:
+                    known[algo] = hash_file(path, algo)
+                if known[algo] != expected.lower():
+                    stale = True
+
+            if stale:
+                self._remove(key)
+                self._save_index()
+                return None
+
+            entry["last_used"] = time.time()
+            self._save_index()
+            return path
+
+    def get_entry(self, url):
+        with self._lock:
+            entry = self.entries.get(cache_key(url))
+            return dict(entry) if entry else None
+
+    def store(self, url, src_path, filename="", digests=None):
+        """Move a finished download into the cache and return its cached path."""
+        key = cache_key(url)
+        dest = self.path_for(url, filename)
+
+        with self._lock:
+            if key in self.entries and self.entries[key]["path"] != dest:
+                self._remove(key)
+
+            os.replace(src_path, dest)
+            self.entries[key] = {
+                "url": url,
+                "path": dest,
+                "filename": filename,
+                "size": os.path.getsize(dest),
+                "digests": {k: v.lower() for k, v in (digests or {}).items()},
+                "last_used": time.time(),
+            }
+            self.evict(keep=key)
+            self._save_index()
+        return dest
+
+    def discard(self, url):
+        with self._lock:
+            self._remove(cache_key(url))
+            self._save_index()
+
+    def total_size(self):
+        with self._lock:
+            return sum(e.get("size", 0) for e in self.entries.values())
+
+    def set_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = max(0, int(budget_bytes))
+            self.evict()
+            self._save_index()
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits its budget."""
+        with self._lock:
+            total = self.total_size()
+            for key, entry in sorted(self.entries.items(), key=lambda kv: kv[1].get("last_used", 0)):
+                if total <= self.budget_bytes:
+                    break
+                if key == keep:
+                    continue
+                total -= entry.get("size", 0)
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry and os.path.exists(entry["path"]):
+            try:
+                os.remove(entry["path"])
+            except OSError as e:
+                print(f"Archive cache cleanup error: {e}")
+
+
+_archive_cache = None
+_archive_cache_lock = threading.Lock()
+
+
+def get_archive_cache():
+    global _archive_cache
+    budget_mb = get_settings_service().get("archive_cache_mb", DEFAULT_BUDGET_MB)
+
+    with _archive_cache_lock:
+        if _archive_cache is None:
+            _archive_cache = ArchiveCache(budget_bytes=int(budget_mb) * 1024 * 1024)
+        elif _archive_cache.budget_bytes != int(budget_mb) * 1024 * 1024:
+            _archive_cache.set_budget(int(budget_mb) * 1024 * 1024)
+    return _archive_cache
@@ -1,42 +1,173 @@
 import json
 import os
+import threading
+
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer, QCoreApplication, QThread
 
 SETTINGS_FILE = "data/settings.json"
+RELOAD_DEBOUNCE_MS = 250
 
 DEFAULT_SETTINGS = {
     "minimize_on_launch": False,
     "minimize_to_tray_on_close": False,
-    "check_updates": True
+    "check_updates": True,
+    "developer_mode": False,
+    "performance_mode": False,
+    "archive_cache_mb": 4096,
+    "pixmap_cache_mb": 64,
+    "download_max_concurrency": 2,
+    "download_limit_kbps": 0,
+    "download_limit_game_kbps": 256,
+    "stall_threshold_ms": 250,
+    "proton_script_launch": False,
+    "wineserver_keepalive_s": 0,
+    "background_throttle": True,
+    "download_max_concurrency_game": 1,
+    "metrics_json_path": os.path.join("data", "metrics.json"),
+    "metrics_prometheus_path": "",
+    "metrics_export_interval_s": 0,
+    "trace_enabled": False
 }
 
 
-def load_settings():
+def validate_settings(data):
+    """Coerce known keys to the type of their default; unknown keys pass through."""
+    clean = dict(data)
+    for key, default in DEFAULT_SETTINGS.items():
+        value = data.get(key, default)
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes", "on")
+            else:
+                value = bool(value)
+        elif isinstance(default, int):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = default
+        clean[key] = value
+    return clean
+
+
+def _read_settings():
+    """Validated settings from disk, defaults if there is no file, or None
+    if the file cannot be parsed (half-written, hand-edited, not an object)."""
     if not os.path.exists(SETTINGS_FILE):
         return DEFAULT_SETTINGS.copy()
 
     try:
         with open(SETTINGS_FILE, "r") as f:
             data = json.load(f)
-
-            for key, value in DEFAULT_SETTINGS.items():
-                if key not in data:
-                    data[key] = value
-
-            if "minimize_on_launch" in data:
-                val = data["minimize_on_launch"]
-                if isinstance(val, str):
-                    data["minimize_on_launch"] = (val.lower() == "true")
-
-            return data
     except Exception as e:
         print(f"Error loading settings: {e}")
-        return DEFAULT_SETTINGS.copy()
+        return None
+    if not isinstance(data, dict):
+        print("Error loading settings: not a JSON object")
+        return None
+    return validate_settings(data)
+
+
+def load_settings():
+    data = _read_settings()
+    return DEFAULT_SETTINGS.copy() if data is None else data
 
 
 def save_settings(data):
     try:
         os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-        with open(SETTINGS_FILE, "w") as f:
+        # The watcher (ours and other instances') must never see a partial file.
+        tmp_path = SETTINGS_FILE + ".tmp"
+        with open(tmp_path, "w") as f:
             json.dump(data, f, indent=4)
+        os.replace(tmp_path, SETTINGS_FILE)
     except Exception as e:
-        print(f"Error saving settings: {e}")
\ No newline at end of file
+        print(f"Error saving settings: {e}")
+
+
+class SettingsService(QObject):
+    """Single in-memory copy of ``settings.json``.
+
+    Reads never touch the disk. Writes go through ``update`` and external
+    edits are picked up by a debounced file watcher; either way ``changed``
+    is emitted with only the keys whose value differs.
+    """
+
+    changed = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._data = load_settings()
+
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(RELOAD_DEBOUNCE_MS)
+        self._reload_timer.timeout.connect(self.reload)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_event)
+        self._watcher.directoryChanged.connect(self._on_file_event)
+        self._watch()
+
+    def _watch(self):
+        settings_dir = os.path.dirname(os.path.abspath(SETTINGS_FILE))
+        if os.path.isdir(settings_dir) and settings_dir not in self._watcher.directories():
+            self._watcher.addPath(settings_dir)
+        if os.path.exists(SETTINGS_FILE) and os.path.abspath(SETTINGS_FILE) not in self._watcher.files():
+            self._watcher.addPath(os.path.abspath(SETTINGS_FILE))
+
+    def _on_file_event(self, _path):
+        self._reload_timer.start()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def all(self):
+        with self._lock:
+            return dict(self._data)
+
+    def _apply(self, new_data):
+        new_data = validate_settings(new_data)
+        with self._lock:
+            diff = {k: v for k, v in new_data.items() if self._data.get(k) != v}
+            self._data = new_data
+        if diff:
+            self.changed.emit(diff)
+        return diff
+
+    def update(self, values):
+        data = self.all()
+        data.update(values)
+        diff = self._apply(data)
+        if diff:
+            save_settings(self.all())
+        return diff
+
+    def set(self, key, value):
+        return self.update({key: value})
+
+    def reload(self):
+        self._watch()
+        data = _read_settings()
+        if data is None:
+            # Keep what we have; resetting here would also write the
+            # defaults over the user's file on the next update().
+            return {}
+        return self._apply(data)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_settings_service():
+    """Return the shared settings service, parked on the GUI thread when one exists."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = SettingsService()
+            app = QCoreApplication.instance()
+            if app is not None and QThread.currentThread() != app.thread():
+                _service.moveToThread(app.thread())
+    return _service
@@ -1,9 +1,24 @@
 import json
 import os
 
+from skcore.metrics import gauge, histogram
+from skcore.trace import traced
+
 DB_PATH = os.path.join("data", "games.json")
 
-def load_games():
+@traced("load_games", cat="io")
+def load_games(strict=False):
+    """Read the library. A missing games.json is an empty library; one that
+    exists but can't be read gives [] as well, or None with ``strict=True`` so
+    callers that delete things can tell the two apart."""
+    with histogram("library_load_seconds", "Time to read games.json").time():
+        games = _read_games()
+    if games is None:
+        return None if strict else []
+    gauge("library_games", "Games in the library").set(len(games))
+    return games
+
+def _read_games():
     if not os.path.exists(DB_PATH):
         return []
 
@@ -14,15 +29,24 @@ def load_games():
                 return data
             elif isinstance(data, dict):
                 return list(data.values())
-            return []
-    except (json.JSONDecodeError, IOError):
-        return []
+            print(f"Library error: {DB_PATH} is not a list of games")
+            return None
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Library error: {e}")
+        return None
 
+@traced("save_games", cat="io")
 def save_games(games):
     if not os.path.exists("data"):
         os.makedirs("data")
 
-    with open(DB_PATH, "w") as f:
-        if not isinstance(games, list):
-            games = []
-        json.dump(games, f, indent=4)
\ No newline at end of file
+    if not isinstance(games, list):
+        games = []
+
+    # Written from the task executor; never leave a half-written library behind.
+    with histogram("library_save_seconds", "Time to write games.json").time():
+        tmp_path = DB_PATH + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(games, f, indent=4)
+        os.replace(tmp_path, DB_PATH)
+    gauge("library_games", "Games in the library").set(len(games))
\ No newline at end of file
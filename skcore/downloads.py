@@ -0,0 +1,360 @@
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+from skcore import net
+from skcore.cache import get_archive_cache
+from skcore.config import get_settings_service
+from skcore import trace
+from skcore.metrics import counter, histogram
+from skcore.throttle import get_background_throttle
+from skcore.runners import parse_checksum
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+CHUNK_SIZE = 256 * 1024
+DOWNLOAD_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+QUEUED, RUNNING, PAUSED, CANCELLED, DONE, FAILED = "queued", "running", "paused", "cancelled", "done", "failed"
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class DownloadPaused(Exception):
+    pass
+
+
+class RateLimiter:
+    """Token bucket shared by every running job. A rate of 0 means unlimited."""
+
+    def __init__(self, rate=0):
+        self.rate = rate
+        self._allowance = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = max(0, int(rate))
+            self._allowance = 0.0
+            self._last = time.monotonic()
+
+    def consume(self, amount):
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+                self._last = now
+                if self._allowance >= amount or self._allowance >= self.rate:
+                    self._allowance -= amount
+                    return
+                wait = (amount - self._allowance) / self.rate
+            time.sleep(min(wait, 0.25))
+
+
+class DownloadJob:
+    """A single queued download.
+
+    ``then`` runs on the worker thread with ``(job, archive_path)`` once the
+    archive is verified and cached, which is where extraction belongs.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, url, filename, priority=PRIORITY_NORMAL, size=0, checksum=None,
+                 checksum_url=None, checksum_algo="sha512", cache_url=None, use_cache=True, then=None, label=""):
+        self.id = f"dl-{next(self._ids)}"
+        self.url = url
+        self.filename = filename
+        self.priority = priority
+        self.size = size
+        self.checksum = checksum
+        self.checksum_url = checksum_url
+        self.checksum_algo = checksum_algo
+        self.cache_url = cache_url or url
+        self.use_cache = use_cache
+        self.then = then
+        self.label = label or filename
+
+        self.state = QUEUED
+        self.downloaded = 0
+        self.total = size
+        self.digest = ""
+        self.path = ""
+        self.error = ""
+        self._hasher = None
+        self._flag = None
+
+    @property
+    def algo(self):
+        return self.checksum[0] if self.checksum else "sha256"
+
+
+class DownloadManager(QObject):
+    job_added = Signal(str)
+    job_state = Signal(str, str)
+    job_progress = Signal(str, int)
+    job_status = Signal(str, str)
+    job_finished = Signal(str, str)
+    job_failed = Signal(str, str)
+
+    def __init__(self, max_concurrency=2, limit_bps=0, game_limit_bps=256 * 1024, game_max_concurrency=1,
+                 parent=None):
+        super().__init__(parent)
+        self.max_concurrency = max_concurrency
+        self.game_max_concurrency = game_max_concurrency
+        self.limit_bps = limit_bps
+        self.game_limit_bps = game_limit_bps
+        self.game_active = False
+        self.limiter = RateLimiter(limit_bps)
+
+        self.jobs = {}
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._lock = threading.RLock()
+
+    def configure(self, max_concurrency=None, limit_bps=None, game_limit_bps=None, game_max_concurrency=None):
+        with self._lock:
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, int(max_concurrency))
+            if game_max_concurrency is not None:
+                self.game_max_concurrency = max(1, int(game_max_concurrency))
+            if limit_bps is not None:
+                self.limit_bps = max(0, int(limit_bps))
+            if game_limit_bps is not None:
+                self.game_limit_bps = max(0, int(game_limit_bps))
+            self._apply_rate()
+            self._schedule()
+
+    def apply_settings(self, values):
+        self.configure(
+            max_concurrency=values.get("download_max_concurrency"),
+            limit_bps=values["download_limit_kbps"] * 1024 if "download_limit_kbps" in values else None,
+            game_limit_bps=values["download_limit_game_kbps"] * 1024 if "download_limit_game_kbps" in values else None,
+            game_max_concurrency=values.get("download_max_concurrency_game"),
+        )
+
+    def set_game_active(self, active):
+        with self._lock:
+            self.game_active = bool(active)
+            self._apply_rate()
+        self._schedule()
+
+    def _apply_rate(self):
+        rate = self.limit_bps
+        if self.game_active and self.game_limit_bps:
+            rate = min(rate, self.game_limit_bps) if rate else self.game_limit_bps
+        self.limiter.set_rate(rate)
+
+    def submit(self, job):
+        with self._lock:
+            self.jobs[job.id] = job
+            self._push(job)
+        self.job_added.emit(job.id)
+        self._schedule()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def is_paused(self, job_id):
+        job = self.jobs.get(job_id)
+        return bool(job) and (job.state == PAUSED or job._flag == PAUSED)
+
+    def active_jobs(self):
+        with self._lock:
+            return [j for j in self.jobs.values() if j.state in (QUEUED, RUNNING, PAUSED)]
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job or job.state in (DONE, FAILED, CANCELLED):
+                return
+            if job.state == RUNNING:
+                job._flag = CANCELLED
+                return
+            self._discard_partial(job)
+            self._set_state(job, CANCELLED)
+
+    def pause(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            if job.state == RUNNING:
+                job._flag = PAUSED
+            elif job.state == QUEUED:
+                self._set_state(job, PAUSED)
+
+    def resume(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            if job.state == RUNNING and job._flag == PAUSED:
+                job._flag = None
+            elif job.state == PAUSED:
+                self._set_state(job, QUEUED)
+                self._push(job)
+        self._schedule()
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (job.priority, next(self._seq), job))
+
+    def _set_state(self, job, state):
+        job.state = state
+        self.job_state.emit(job.id, state)
+
+    def _schedule(self):
+        with self._lock:
+            limit = self.max_concurrency
+            if self.game_active:
+                # Running jobs finish; new ones start only below the cap.
+                limit = min(limit, self.game_max_concurrency)
+            while self._running < limit and self._queue:
+                _, _, job = heapq.heappop(self._queue)
+                if job.state != QUEUED:
+                    continue
+                self._running += 1
+                job._flag = None
+                self._set_state(job, RUNNING)
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        try:
+            with get_background_throttle().worker(), trace.span("download", cat="download", label=job.label):
+                with histogram("download_seconds", "Download and verify time per job", buckets=DOWNLOAD_BUCKETS).time():
+                    path = self._fetch(job)
+                job.path = path
+                if job.then:
+                    job.then(job, path)
+            with self._lock:
+                self._set_state(job, DONE)
+            counter("downloads_total", "Finished download jobs", result=DONE).inc()
+            self.job_finished.emit(job.id, path)
+        except DownloadPaused:
+            with self._lock:
+                self._set_state(job, PAUSED)
+        except DownloadCancelled:
+            with self._lock:
+                self._discard_partial(job)
+                self._set_state(job, CANCELLED)
+            counter("downloads_total", "Finished download jobs", result=CANCELLED).inc()
+        except Exception as e:
+            job.error = str(e)
+            counter("downloads_total", "Finished download jobs", result=FAILED).inc()
+            with self._lock:
+                self._set_state(job, FAILED)
+            self.job_failed.emit(job.id, job.error)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._schedule()
+
+    def set_status(self, job, text):
+        self.job_status.emit(job.id, text)
+
+    def _fetch(self, job):
+        if job.checksum is None and job.checksum_url:
+            r = net.get(job.checksum_url, timeout=(5, 10))
+            r.raise_for_status()
+            digest = parse_checksum(r.text, job.filename)
+            if digest:
+                job.checksum = (job.checksum_algo, digest)
+
+        cache = get_archive_cache()
+        cached = None
+        if job.use_cache:
+            cached = cache.lookup(job.cache_url, size=job.size or None,
+                                  digests=dict([job.checksum]) if job.checksum else None)
+        if cached:
+            job.digest = cache.get_entry(job.cache_url)["digests"].get(job.algo, "")
+            self.set_status(job, f"Using cached {job.filename}...")
+            self.job_progress.emit(job.id, 100)
+            return cached
+
+        part_path = cache.partial_path(job.cache_url)
+        headers = {}
+        if job._hasher is not None and os.path.exists(part_path):
+            job.downloaded = os.path.getsize(part_path)
+            headers["Range"] = f"bytes={job.downloaded}-"
+        else:
+            job.downloaded = 0
+            job._hasher = hashlib.new(job.algo)
+
+        self.set_status(job, f"Downloading {job.label}...")
+        with net.get(job.url, stream=True, headers=headers) as response:
+            response.raise_for_status()
+
+            mode = "ab"
+            if headers and response.status_code != 206:
+                mode = "wb"
+                job.downloaded = 0
+                job._hasher = hashlib.new(job.algo)
+
+            length = int(response.headers.get("content-length", 0))
+            job.total = job.downloaded + length if length else job.size
+
+            received = counter("download_bytes_total", "Bytes received by the download queue")
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if job._flag == CANCELLED:
+                        raise DownloadCancelled()
+                    if job._flag == PAUSED:
+                        raise DownloadPaused()
+                    if not chunk:
+                        continue
+                    self.limiter.consume(len(chunk))
+                    f.write(chunk)
+                    received.inc(len(chunk))
+                    job._hasher.update(chunk)
+                    job.downloaded += len(chunk)
+                    if job.total:
+                        self.job_progress.emit(job.id, int(job.downloaded * 100 / job.total))
+
+        job.digest = job._hasher.hexdigest()
+        job._hasher = None
+        if job.checksum and job.digest != job.checksum[1]:
+            os.remove(part_path)
+            raise ValueError(f"Checksum mismatch for {job.filename} ({job.algo}).\n"
+                             f"Expected {job.checksum[1][:16]}..., got {job.digest[:16]}...")
+
+        return cache.store(job.cache_url, part_path, filename=job.filename, digests={job.algo: job.digest})
+
+    def _discard_partial(self, job):
+        job._hasher = None
+        part_path = get_archive_cache().partial_path(job.cache_url)
+        if os.path.exists(part_path):
+            try:
+                os.remove(part_path)
+            except OSError as e:
+                print(f"Download cleanup error: {e}")
+
+
+_manager = None
+
+
+def get_download_manager():
+    """Return the process-wide manager; the first call must come from the GUI thread."""
+    global _manager
+    if _manager is None:
+        settings = get_settings_service()
+        _manager = DownloadManager()
+        _manager.apply_settings(settings.all())
+        settings.changed.connect(_manager.apply_settings)
+        throttle = get_background_throttle()
+        _manager.set_game_active(throttle.active)
+        throttle.changed.connect(_manager.set_game_active)
+    return _manager
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tarfile
+import tempfile
+
+from skcore.downloads import DownloadJob, get_download_manager, PRIORITY_NORMAL
+from skcore.manifest import record_install
+from skcore import trace
+from skcore.metrics import histogram
+from skcore.runners import RUNNERS_DIR, set_executable_permissions
+
+EXTRACT_BUCKETS = (1, 2.5, 5, 10, 20, 40, 80, 160, 320)
+
+
+def extract_runner(archive_path, version_dir):
+    """Unpack a runner archive into ``version_dir`` and mark its files executable.
+
+    Extraction goes to a hidden sibling directory that is moved into place
+    only once complete, so a failed or interrupted install never leaves a
+    partial runner that the manifest would count as installed.
+    """
+    parent = os.path.dirname(version_dir)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{os.path.basename(version_dir)}-", dir=parent)
+    try:
+        with histogram("runner_extract_seconds", "Runner archive extraction time", buckets=EXTRACT_BUCKETS).time(), \
+                trace.span("extract", cat="download", archive=os.path.basename(archive_path)):
+            with tarfile.open(archive_path) as tar:
+                tar.extractall(path=staging)
+
+            set_executable_permissions(staging)
+        os.chmod(staging, 0o755)
+        if os.path.exists(version_dir):
+            shutil.rmtree(version_dir)
+        os.replace(staging, version_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def submit_runner_install(r_type, v_data, priority=PRIORITY_NORMAL):
+    """Queue download, verification and extraction of a runner release."""
+    manager = get_download_manager()
+    version_dir = os.path.join(RUNNERS_DIR, r_type.lower(), v_data['name'])
+
+    def extract(job, archive_path):
+        manager.set_status(job, "Extracting files...")
+        extract_runner(archive_path, version_dir)
+        record_install(r_type, v_data['name'], archive=v_data['filename'], url=v_data['url'],
+                       digests={job.algo: job.digest}, verified=job.checksum is not None)
+
+    job = DownloadJob(v_data['url'], v_data['filename'], priority=priority,
+                      size=v_data.get('size', 0),
+                      checksum_url=v_data.get('checksum_url'),
+                      checksum_algo=v_data.get('checksum_algo', "sha512"),
+                      then=extract, label=v_data['name'])
+    return manager.submit(job)
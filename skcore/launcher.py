@@ -1,20 +1,336 @@
 import os
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
 from PySide6.QtCore import QProcess, QProcessEnvironment
+from skcore.metrics import counter, histogram
 from skcore.runners import get_runner_executable
+from skcore.trace import traced
 
-def launch_game(game, process_obj):
+ELF_MAGIC = b"\x7fELF"
+SHEBANG = b"#!"
+# Scripts by name, for files that lack a "#!" line: never hand them to Wine.
+SCRIPT_EXTENSIONS = (".sh", ".bash", ".py", ".pl")
+# Inherited variables that would make a native game think it runs under Wine/Proton.
+FOREIGN_ENV_PREFIXES = ("WINE", "PROTON_", "STEAM_COMPAT_", "DXVK_", "VKD3D_")
+
+_native_cache = {}
+_native_lock = threading.Lock()
+WINESERVER_READY_TIMEOUT_S = 1.0
+WINESERVER_PROBE_TIMEOUT_S = 0.2
+WINESERVER_STOP_TIMEOUT_S = 5.0
+# Written into a prefix next to the keepalive server it started: "<pid> <wineserver>".
+KEEPALIVE_MARKER = ".sk_wineserver"
+
+
+def detect_native(path):
+    """``"elf"``, ``"script"`` or ``None`` (a Windows binary) for ``path``.
+    A file with a script extension is a script even without a ``#!`` line.
+
+    Only the first bytes are read, and the answer is cached per path until
+    the file's mtime or size changes.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _native_lock:
+        cached = _native_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    try:
+        with open(path, "rb") as f:
+            head = f.read(4)
+    except OSError:
+        return None
+
+    if head == ELF_MAGIC:
+        kind = "elf"
+    elif head.startswith(SHEBANG) or path.lower().endswith(SCRIPT_EXTENSIONS):
+        kind = "script"
+    else:
+        kind = None
+    with _native_lock:
+        _native_cache[path] = (stamp, kind)
+    return kind
+
+
+def _shebang_command(path):
+    with open(path, "rb") as f:
+        line = f.readline(256)
+    if not line.startswith(SHEBANG):
+        return []
+    return shlex.split(line[2:].decode(errors="replace").strip())
+
+
+def _prepare_native(game_path, game_dir, kind):
+    env = QProcessEnvironment.systemEnvironment()
+    for key in env.keys():
+        if key.startswith(FOREIGN_ENV_PREFIXES):
+            env.remove(key)
+
+    if os.access(game_path, os.X_OK):
+        return LaunchPlan(game_path, [], env, game_dir), None
+    if kind == "script":
+        command = _shebang_command(game_path)
+        if command:
+            return LaunchPlan(command[0], command[1:] + [game_path], env, game_dir), None
+    return None, f"{os.path.basename(game_path)} is not executable (chmod +x)"
+
+
+class LaunchPlan:
+    """Everything ``QProcess.start`` needs, resolved ahead of time."""
+
+    def __init__(self, program, arguments, env, working_dir, wineserver=None, wineprefix=None):
+        self.program = program
+        self.arguments = arguments
+        self.env = env
+        self.working_dir = working_dir
+        self.wineserver = wineserver
+        self.wineprefix = wineprefix
+
+
+def _proton_base(runner_exe):
+    if "files" in runner_exe:
+        return os.path.dirname(os.path.dirname(os.path.dirname(runner_exe)))
+    return os.path.dirname(os.path.dirname(runner_exe))
+
+
+def _find_wineserver(runner_exe):
+    if os.path.isabs(runner_exe):
+        candidate = os.path.join(os.path.dirname(runner_exe), "wineserver")
+        return candidate if os.path.exists(candidate) else None
+    return shutil.which("wineserver")
+
+
+def prefix_path(game):
+    safe_name = game['name'].replace(" ", "_")
+    return os.path.abspath(os.path.join("data", "prefixes", safe_name))
+
+
+def wineserver_socket(wineprefix):
+    """Path of the socket a running wineserver for ``wineprefix`` listens on."""
+    try:
+        st = os.stat(wineprefix)
+    except OSError:
+        return None
+    return os.path.join(f"/tmp/.wine-{os.getuid()}", f"server-{st.st_dev:x}-{st.st_ino:x}", "socket")
+
+
+def wineserver_running(wineprefix):
+    """Whether a wineserver accepts connections for ``wineprefix``. The
+    socket file alone proves nothing: a killed or crashed server leaves it
+    behind, and connecting to that fails with ECONNREFUSED."""
+    socket_path = wineserver_socket(wineprefix)
+    if not socket_path or not os.path.exists(socket_path):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(WINESERVER_PROBE_TIMEOUT_S)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def wineserver_pid(wineprefix):
+    """PID of the prefix's wineserver; the server runs inside its socket directory."""
+    socket_path = wineserver_socket(wineprefix)
+    if not socket_path:
+        return None
+    server_dir = os.path.dirname(socket_path)
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            if os.readlink(f"/proc/{entry}/cwd") == server_dir:
+                return int(entry)
+        except OSError:
+            continue
+    return None
+
+
+def _read_keepalive(wineprefix):
+    """``(pid, wineserver)`` from the prefix's keepalive marker, if it is
+    still the prefix's running server, else ``(None, None)``."""
+    try:
+        with open(os.path.join(wineprefix, KEEPALIVE_MARKER), "r") as f:
+            pid, _, wineserver = f.read().strip().partition(" ")
+    except OSError:
+        return None, None
+    socket_path = wineserver_socket(wineprefix)
+    if not pid.isdigit() or not socket_path:
+        return None, None
+    # The marker outlives its server (and the pid may be reused); only trust
+    # it while that pid is a process running in the server's directory.
+    try:
+        if os.readlink(f"/proc/{pid}/cwd") != os.path.dirname(socket_path):
+            return None, None
+    except OSError:
+        return None, None
+    return int(pid), wineserver or None
+
+
+def keepalive_pid(wineprefix):
+    """PID of the prefix's keepalive wineserver, or None if it has none running."""
+    return _read_keepalive(wineprefix)[0]
+
+
+def keepalive_owner(wineprefix):
+    """The wineserver binary that started the prefix's running keepalive
+    server, or None if the running server (if any) is not one of ours."""
+    return _read_keepalive(wineprefix)[1]
+
+
+def _record_keepalive(wineprefix, wineserver):
+    pid = wineserver_pid(wineprefix)
+    if pid is None:
+        return
+    try:
+        with open(os.path.join(wineprefix, KEEPALIVE_MARKER), "w") as f:
+            f.write(f"{pid} {wineserver}\n")
+    except OSError as e:
+        print(f"wineserver marker error: {e}")
+
+
+def stop_wineserver(wineprefix, wineserver):
+    """``wineserver -k`` for ``wineprefix`` using ``wineserver``, which must
+    be the binary of the runner that started it (another runner's build
+    refuses to talk to it). Waits until the server is gone."""
+    if not wineserver or not wineserver_running(wineprefix):
+        return False
+    env = dict(os.environ, WINEPREFIX=wineprefix)
+    try:
+        subprocess.run([wineserver, "-k"], env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=WINESERVER_STOP_TIMEOUT_S)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"wineserver stop error: {e}")
+
+    deadline = time.monotonic() + WINESERVER_STOP_TIMEOUT_S
+    while time.monotonic() < deadline and wineserver_running(wineprefix):
+        time.sleep(0.05)
+    return not wineserver_running(wineprefix)
+
+
+def stop_foreign_wineserver(wineprefix, wineserver, previous=None):
+    """Stop the prefix's server if another runner's wineserver owns it: our
+    keepalive as recorded in the prefix, else ``previous`` (the runner the
+    game used before). A server of a different Wine version makes every
+    client fail with a protocol mismatch."""
+    if not wineprefix or not wineserver_running(wineprefix):
+        return False
+    owner = keepalive_owner(wineprefix) or previous
+    if not owner or owner == wineserver:
+        return False
+    return stop_wineserver(wineprefix, owner)
+
+
+def previous_wineserver(game):
+    """The wineserver of ``game``'s runner (a snapshot from before a change)."""
+    if not game:
+        return None
+    return _find_wineserver(get_runner_executable(game))
+
+
+def keep_wineserver_alive(plan, seconds):
+    """Start the prefix's wineserver with ``-p<seconds>`` so it outlives the
+    game and the next launch skips the cold start. Waits briefly for its
+    socket so a game started right after connects to it instead of
+    spawning a short-lived server of its own.
+
+    A keepalive left running by a different runner is stopped and replaced.
+    """
+    if seconds <= 0 or not plan.wineserver or not plan.wineprefix:
+        return False
+    if not os.path.isdir(plan.wineprefix):
+        return False
+    stop_foreign_wineserver(plan.wineprefix, plan.wineserver)
+    if wineserver_running(plan.wineprefix):
+        return False
+
+    env = {k: plan.env.value(k) for k in plan.env.keys()}
+    try:
+        subprocess.Popen([plan.wineserver, f"-p{int(seconds)}"], env=env, cwd=plan.wineprefix,
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+    except OSError as e:
+        print(f"wineserver start error: {e}")
+        return False
+
+    deadline = time.monotonic() + WINESERVER_READY_TIMEOUT_S
+    while time.monotonic() < deadline and not wineserver_running(plan.wineprefix):
+        time.sleep(0.02)
+    _record_keepalive(plan.wineprefix, plan.wineserver)
+    return True
+
+
+def prewarm_wineserver(game, seconds, use_proton_script=False):
+    """Called when a game is selected: get its wineserver up before PLAY.
+    Prefixes that were never launched are left alone."""
+    if seconds <= 0 or not os.path.isdir(prefix_path(game)):
+        return False
+    # Not a launch: keep it out of the launch metrics.
+    plan, _ = prepare_launch(game, use_proton_script, record=False)
+    if plan is None:
+        return False
+    return keep_wineserver_alive(plan, seconds)
+
+
+@traced(cat="launch")
+def prepare_launch(game, use_proton_script=False, keepalive_s=0, record=True):
+    """Resolve the runner, create the prefix and build the environment.
+    Native Linux executables are started directly, without a prefix.
+
+    With ``use_proton_script`` a Proton runner is started through its own
+    ``proton run`` entry point, which keeps its Wine prefix in ``<prefix>/pfx``
+    rather than directly in the game's prefix folder. With ``keepalive_s``
+    the prefix's wineserver is started persistent before the game. With
+    ``record=False`` the launch metrics are left alone, for callers that
+    only need the plan (prewarm, prefix updates).
+
+    Touches the disk, so the UI calls it through the task executor. Returns
+    ``(plan, None)`` or ``(None, error_message)``.
+    """
+    if not record:
+        return _prepare_launch(game, use_proton_script, keepalive_s)
+    with histogram("launch_prepare_seconds", "Time to resolve runner, prefix and environment").time():
+        plan, error = _prepare_launch(game, use_proton_script, keepalive_s)
+    if plan is None:
+        counter("launch_failures_total", "Launches that could not be prepared").inc()
+    return plan, error
+
+
+def _prepare_launch(game, use_proton_script, keepalive_s):
     runner_exe = get_runner_executable(game)
     game_path = os.path.abspath(game.get("path", ""))
     game_dir = os.path.dirname(game_path)
     r_type = game.get("runner_type", "System")
 
     if not os.path.exists(game_path):
-        return False, "Executable path not found!"
+        return None, "Executable path not found!"
+
+    native = detect_native(game_path)
+    if native:
+        return _prepare_native(game_path, game_dir, native)
 
     env = QProcessEnvironment.systemEnvironment()
 
-    safe_name = game['name'].replace(" ", "_")
-    prefix = os.path.abspath(os.path.join("data", "prefixes", safe_name))
+    prefix = prefix_path(game)
     os.makedirs(prefix, exist_ok=True)
     env.insert("WINEPREFIX", prefix)
 
@@ -27,11 +343,18 @@ def launch_game(game, process_obj):
         env.insert("LD_LIBRARY_PATH", f"{lib64}:{lib32}:{current_ld}".strip(":"))
 
     elif r_type == "Proton":
-        proton_base = ""
-        if "files" in runner_exe:
-            proton_base = os.path.dirname(os.path.dirname(os.path.dirname(runner_exe)))
-        else:
-            proton_base = os.path.dirname(os.path.dirname(runner_exe))
+        proton_base = _proton_base(runner_exe)
+        proton_script = os.path.join(proton_base, "proton")
+
+        if use_proton_script and os.path.isfile(proton_script):
+            env.insert("STEAM_COMPAT_CLIENT_INSTALL_PATH", os.path.abspath("data"))
+            env.insert("STEAM_COMPAT_DATA_PATH", prefix)
+            wineprefix = os.path.join(prefix, "pfx")
+            env.insert("WINEPREFIX", wineprefix)
+            plan = LaunchPlan(proton_script, ["run", game_path], env, game_dir,
+                              _find_wineserver(runner_exe), wineprefix)
+            keep_wineserver_alive(plan, keepalive_s)
+            return plan, None
 
         lib64 = os.path.join(proton_base, "files", "lib64")
         lib32 = os.path.join(proton_base, "files", "lib")
@@ -44,10 +367,28 @@ def launch_game(game, process_obj):
         env.insert("PROTON_FORCE_LARGE_ADDRESS_AWARE", "1")
         env.insert("PROTON_NO_ESYNC", "1")
 
-    process_obj.setProcessEnvironment(env)
-    process_obj.setWorkingDirectory(game_dir)
+    plan = LaunchPlan(runner_exe, [game_path], env, game_dir, _find_wineserver(runner_exe), prefix)
+    keep_wineserver_alive(plan, keepalive_s)
+    return plan, None
+
+
+@traced(cat="launch")
+def start_launch(plan, process_obj):
+    process_obj.setProcessEnvironment(plan.env)
+    process_obj.setWorkingDirectory(plan.working_dir)
     process_obj.setProcessChannelMode(QProcess.MergedChannels)
+    if hasattr(QProcess, "UnixProcessFlag"):
+        # Session leader, so the whole tree can be found and torn down on STOP.
+        process_obj.setUnixProcessParameters(QProcess.UnixProcessFlag.CreateNewSession)
+
+    process_obj.start(plan.program, plan.arguments)
+    counter("launches_total", "Games started", kind="wine" if plan.wineprefix else "native").inc()
+
+
+def launch_game(game, process_obj, use_proton_script=False):
+    plan, error = prepare_launch(game, use_proton_script)
+    if plan is None:
+        return False, error
 
-    process_obj.start(runner_exe, [game_path])
-    
+    start_launch(plan, process_obj)
     return True, "Success"
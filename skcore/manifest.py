@@ -0,0 +1,283 @@
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from skcore.runners import RUNNERS_DIR, CUSTOM_RUNNERS_DIR
+from skcore.throttle import get_background_throttle
+from skcore.trace import traced
+
+MANIFEST_FILE = os.path.join(RUNNERS_DIR, "manifest.json")
+RUNNER_TYPES = {"Wine": os.path.join(RUNNERS_DIR, "wine"),
+                "Proton": os.path.join(RUNNERS_DIR, "proton"),
+                "Custom": CUSTOM_RUNNERS_DIR}
+SCAN_WORKERS = 4
+
+
+def runner_key(runner_type, version_name):
+    return f"{runner_type.lower()}/{version_name}"
+
+
+def _tree_size(path):
+    total = files = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total, files
+
+
+def _split_work(path, min_items=SCAN_WORKERS):
+    """Expand single-child levels (archives usually wrap everything in one
+    folder) so the walk can be spread across workers."""
+    roots, loose = [path], []
+    for _ in range(3):
+        if len(roots) >= min_items:
+            break
+        next_roots = []
+        for root in roots:
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            next_roots.append(entry.path)
+                        else:
+                            loose.append(entry)
+            except OSError:
+                continue
+        roots = next_roots
+    return roots, loose
+
+
+def _stamp(path):
+    """Cheap change marker: newest mtime of the runner dir and its direct children."""
+    try:
+        newest = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            for entry in it:
+                newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+        return newest
+    except OSError:
+        return 0
+
+
+class RunnerManifest:
+    """In-memory view of installed runners, persisted to ``manifest.json``.
+
+    Directory discovery is a listing of three folders; sizes come from a
+    parallel ``scandir`` walk that only revisits runners whose stamp changed.
+    """
+
+    def __init__(self, manifest_file=MANIFEST_FILE, runner_dirs=None):
+        self.manifest_file = manifest_file
+        self.runner_dirs = runner_dirs or RUNNER_TYPES
+        self.entries = self._load()
+        self.references = {}
+        self._lock = threading.RLock()
+        self._scan_thread = None
+        self._rescan = False
+
+    def _load(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, "r") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+            tmp_path = self.manifest_file + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=4)
+            os.replace(tmp_path, self.manifest_file)
+
+    def is_installed(self, runner_type, version_name):
+        if runner_type == "System":
+            return True
+        with self._lock:
+            return runner_key(runner_type, version_name) in self.entries
+
+    def runners(self, runner_type=None):
+        with self._lock:
+            items = [dict(e) for e in self.entries.values()
+                     if runner_type is None or e["type"] == runner_type]
+        return sorted(items, key=lambda e: e["version"].lower())
+
+    def total_size(self):
+        with self._lock:
+            return sum(e.get("size", 0) for e in self.entries.values())
+
+    def record_install(self, runner_type, version_name, **fields):
+        key = runner_key(runner_type, version_name)
+        with self._lock:
+            entry = self.entries.setdefault(key, {})
+            entry.update({"type": runner_type, "version": version_name,
+                          "path": os.path.join(self.runner_dirs[runner_type], version_name),
+                          "installed_at": time.time(), "stamp": 0})
+            entry.update(fields)
+            self.save()
+        self.refresh_async()
+        return entry
+
+    def discover(self):
+        """Sync entries with what is actually on disk. Returns keys needing a size walk."""
+        found = {}
+        for r_type, base in self.runner_dirs.items():
+            try:
+                with os.scandir(base) as it:
+                    for d in it:
+                        # Dot directories are installs still being extracted.
+                        if d.is_dir() and not d.name.startswith("."):
+                            found[runner_key(r_type, d.name)] = (r_type, d.name, d.path)
+            except OSError:
+                continue
+
+        stale = []
+        with self._lock:
+            for key in list(self.entries):
+                if key not in found:
+                    del self.entries[key]
+            for key, (r_type, name, path) in found.items():
+                entry = self.entries.setdefault(key, {"type": r_type, "version": name, "installed_at": 0})
+                entry["path"] = path
+                stamp = _stamp(path)
+                if entry.get("stamp") != stamp or "size" not in entry:
+                    entry["stamp"] = stamp
+                    stale.append(key)
+        return stale
+
+    @traced("RunnerManifest.refresh", cat="io")
+    def refresh(self):
+        stale = self.discover()
+
+        throttle = get_background_throttle()
+        workers = 1 if throttle.active else SCAN_WORKERS
+
+        def tree_size(path):
+            with throttle.worker():
+                return _tree_size(path)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for key in stale:
+                path = self.entries[key]["path"]
+                roots, loose = _split_work(path)
+                size = files = 0
+                for entry in loose:
+                    try:
+                        size += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+                    except OSError:
+                        pass
+                for s, f in pool.map(tree_size, roots):
+                    size += s
+                    files += f
+                with self._lock:
+                    if key in self.entries:
+                        self.entries[key].update({"size": size, "files": files, "scanned_at": time.time()})
+
+        self.save()
+
+    def refresh_async(self):
+        with self._lock:
+            if self._scan_thread and self._scan_thread.is_alive():
+                self._rescan = True
+                return
+            self._scan_thread = threading.Thread(target=self._scan_loop, daemon=True)
+            self._scan_thread.start()
+
+    def _scan_loop(self):
+        while True:
+            with self._lock:
+                self._rescan = False
+            with get_background_throttle().worker():
+                self.refresh()
+            with self._lock:
+                if not self._rescan:
+                    return
+
+    def update_references(self, games):
+        refs = {}
+        for g in games:
+            r_type = g.get("runner_type", "System")
+            r_ver = g.get("runner_version", "")
+            if r_type != "System" and r_ver:
+                refs.setdefault(runner_key(r_type, r_ver), []).append(g.get("name", ""))
+        with self._lock:
+            self.references = refs
+
+    def users_of(self, runner_type, version_name):
+        with self._lock:
+            return list(self.references.get(runner_key(runner_type, version_name), []))
+
+    def unreferenced(self, include_custom=False):
+        with self._lock:
+            return [dict(e) for key, e in self.entries.items()
+                    if key not in self.references and (include_custom or e["type"] != "Custom")]
+
+    def prune(self, games, include_custom=False, dry_run=False):
+        """Delete runners no game points at. Returns the removed entries.
+
+        ``games`` of None means the library could not be read; nothing is
+        deleted then, since every runner would look unused.
+        """
+        if games is None:
+            print("Prune skipped: the game library is not available")
+            return []
+        self.discover()
+        self.update_references(games)
+        victims = self.unreferenced(include_custom)
+        if dry_run:
+            return victims
+
+        for entry in victims:
+            try:
+                shutil.rmtree(entry["path"])
+            except OSError as e:
+                print(f"Prune error for {entry['path']}: {e}")
+                continue
+            with self._lock:
+                self.entries.pop(runner_key(entry["type"], entry["version"]), None)
+        self.save()
+        return victims
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_runner_manifest():
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = RunnerManifest()
+            _manifest.discover()
+    return _manifest
+
+
+def record_install(runner_type, version_name, **fields):
+    return get_runner_manifest().record_install(runner_type, version_name, **fields)
+
+
+def format_size(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
@@ -0,0 +1,50 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+
+from skcore.metrics import get_metrics
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        except OSError:
+            _libc = False
+    return _libc
+
+
+def trim_memory():
+    """Collect garbage and hand freed heap pages back to the OS where glibc allows it."""
+    gc.collect()
+    if not sys.platform.startswith("linux"):
+        return False
+    libc = _get_libc()
+    if not libc or not hasattr(libc, "malloc_trim"):
+        return False
+    try:
+        return bool(libc.malloc_trim(0))
+    except Exception as e:
+        print(f"malloc_trim error: {e}")
+        return False
+
+
+def rss_bytes():
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _collect_metrics(registry):
+    registry.gauge("resident_memory_bytes", "Launcher RSS").set(rss_bytes())
+
+
+get_metrics().add_collector(_collect_metrics)
@@ -0,0 +1,240 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = "sk_"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class Histogram:
+    """Fixed upper bounds in seconds; ``counts[i]`` is not cumulative here,
+    the Prometheus export makes it so."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {"count": self.count, "sum": self.sum,
+                    "buckets": {_number(b): c for b, c in zip(self.buckets + (math.inf,), self.counts)}}
+
+    def samples(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        running = 0
+        for bound, c in zip(self.buckets + (math.inf,), counts):
+            running += c
+            lines.append((f"{self.name}_bucket", self.labels + (("le", _number(bound)),), running))
+        lines.append((f"{self.name}_sum", self.labels, total))
+        lines.append((f"{self.name}_count", self.labels, count))
+        return lines
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and histograms, exported on demand.
+
+    Metrics are created on first use and looked up by name and labels, so
+    instrumented code just calls ``counter("downloads_total").inc()``.
+    Collectors are called right before an export to fill gauges from
+    state kept elsewhere (cache stats, RSS, request timings).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        name = PREFIX + name
+        labels = tuple(sorted(labels.items()))
+        key = (name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, help_text, labels, **kwargs)
+        return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def collect(self):
+        for collector in list(self._collectors):
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: (m.name, m.labels))
+
+    def snapshot(self):
+        data = {}
+        for metric in self.collect():
+            entry = data.setdefault(metric.name, {"type": metric.kind, "help": metric.help, "series": []})
+            entry["series"].append({"labels": dict(metric.labels), "value": metric.snapshot()})
+        return {"timestamp": time.time(), "metrics": data}
+
+    def prometheus_text(self):
+        lines = []
+        seen = set()
+        for metric in self.collect():
+            if metric.name not in seen:
+                seen.add(metric.name)
+                if metric.help:
+                    lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    # node_exporter may read the file at any moment; it must never be partial.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def export_json(path, registry=None):
+    registry = registry or get_metrics()
+    _write_atomic(path, json.dumps(registry.snapshot(), indent=4))
+
+
+def export_prometheus(path, registry=None):
+    """Write the textfile-collector format (the file name should end in .prom)."""
+    registry = registry or get_metrics()
+    _write_atomic(path, registry.prometheus_text())
+
+
+def export_configured(settings):
+    """Write every export enabled in ``settings``; returns the paths written."""
+    written = []
+    for key, exporter in (("metrics_json_path", export_json), ("metrics_prometheus_path", export_prometheus)):
+        path = settings.get(key, "")
+        if not path:
+            continue
+        try:
+            exporter(path)
+            written.append(path)
+        except OSError as e:
+            print(f"Metrics export error ({path}): {e}")
+    return written
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+    return _registry
+
+
+def counter(name, help_text="", **labels):
+    return get_metrics().counter(name, help_text, **labels)
+
+
+def gauge(name, help_text="", **labels):
+    return get_metrics().gauge(name, help_text, **labels)
+
+
+def histogram(name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+    return get_metrics().histogram(name, help_text, buckets=buckets, **labels)
@@ -0,0 +1,93 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from skcore.metrics import get_metrics
+
+USER_AGENT = "SK-Player-Launcher"
+DEFAULT_TIMEOUT = (5, 20)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def get_session():
+    """Process-wide keep-alive session; urllib3 pools connections per host."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+    return _session
+
+
+def _record(host, elapsed, error=False):
+    with _stats_lock:
+        entry = _stats.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["requests"] += 1
+        entry["errors"] += int(error)
+        entry["total_ms"] += elapsed * 1000
+        entry["max_ms"] = max(entry["max_ms"], elapsed * 1000)
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    try:
+        response = get_session().request(method, url, timeout=timeout, **kwargs)
+    except requests.RequestException:
+        _record(host, time.perf_counter() - start, error=True)
+        raise
+    _record(host, time.perf_counter() - start, error=response.status_code >= 400)
+    return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def get_request_stats():
+    """Per-host request counts and time-to-headers, in milliseconds."""
+    with _stats_lock:
+        return {
+            host: dict(entry, avg_ms=entry["total_ms"] / entry["requests"])
+            for host, entry in _stats.items()
+        }
+
+
+def _collect_metrics(registry):
+    for host, entry in get_request_stats().items():
+        registry.gauge("http_requests", "HTTP requests sent, per host", host=host).set(entry["requests"])
+        registry.gauge("http_errors", "Failed HTTP requests, per host", host=host).set(entry["errors"])
+        registry.gauge("http_headers_avg_seconds", "Mean time to response headers", host=host).set(entry["avg_ms"] / 1000)
+        registry.gauge("http_headers_max_seconds", "Slowest time to response headers", host=host).set(entry["max_ms"] / 1000)
+
+
+get_metrics().add_collector(_collect_metrics)
@@ -0,0 +1,178 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal, QCoreApplication, QThread
+
+from skcore.launcher import (prepare_launch, prefix_path, previous_wineserver,
+                             stop_foreign_wineserver, keepalive_owner, stop_wineserver)
+from skcore.trace import traced
+
+PREFIX_WORKERS = 2
+PROGRESS_INTERVAL_S = 1.0
+NICE_LEVEL = 10
+SETTLE_TIMEOUT_S = 30
+
+
+def _low_priority(command):
+    if shutil.which("ionice"):
+        command = ["ionice", "-c", "3"] + command
+    if shutil.which("nice"):
+        command = ["nice", "-n", str(NICE_LEVEL)] + command
+    return command
+
+
+class PrefixUpdater(QObject):
+    """Runs ``wineboot -u`` for a game's prefix after its runner changes, so the
+    first launch on the new runner doesn't sit through the upgrade.
+
+    Jobs run at low CPU/IO priority on a small pool, one per prefix. A second
+    runner change while a job is queued replaces it; while it runs, the new
+    one follows it. ``wait`` lets the launcher block (off the GUI thread)
+    until the prefix is ready, running a still-queued job immediately.
+    """
+
+    job_started = Signal(str, str)
+    job_progress = Signal(str, str)
+    job_finished = Signal(str, str)
+    job_failed = Signal(str, str)
+
+    def __init__(self, max_workers=PREFIX_WORKERS, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sk-prefix")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def schedule(self, game, use_proton_script=False, previous=None):
+        """Queue a prefix update for ``game`` (a snapshot is taken). ``previous``
+        is the game as it was before the runner change; a wineserver of that
+        runner still serving the prefix is stopped first."""
+        game = dict(game)
+        previous = dict(previous) if previous else None
+        key = prefix_path(game)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job and not job["started"]:
+                # The runner that may still be serving the prefix is the one from before the first change.
+                job.update(game=game, proton_script=use_proton_script)
+                return
+            if job:
+                job["next"] = (game, use_proton_script, job["game"])
+                return
+            self._jobs[key] = job = {"game": game, "proton_script": use_proton_script, "previous": previous,
+                                     "started": False, "next": None, "done": threading.Event()}
+        self._pool.submit(self._run, key, job)
+
+    def is_busy(self, game):
+        with self._lock:
+            return prefix_path(game) in self._jobs
+
+    def wait(self, game):
+        key = prefix_path(game)
+        while True:
+            with self._lock:
+                job = self._jobs.get(key)
+                if job is None:
+                    return
+                run_now = not job["started"]
+            if run_now:
+                self._run(key, job)
+            else:
+                job["done"].wait()
+
+    def _run(self, key, job):
+        with self._lock:
+            if job["started"] or self._jobs.get(key) is not job:
+                return
+            job["started"] = True
+            game, use_proton_script, previous = job["game"], job["proton_script"], job["previous"]
+
+        name = game.get("name", "")
+        try:
+            self._update(game, name, use_proton_script, previous)
+        except Exception as e:
+            print(f"Prefix update error for {name}: {e}")
+            self.job_failed.emit(name, str(e))
+        else:
+            self.job_finished.emit(name, "Prefix updated")
+        finally:
+            with self._lock:
+                follow_up = job["next"]
+                del self._jobs[key]
+            job["done"].set()
+            if follow_up is not None:
+                self.schedule(*follow_up)
+
+    @traced("prefix_update", cat="launch")
+    def _update(self, game, name, use_proton_script, previous=None):
+        # Uninstrumented: prefix upgrades must not count as launches.
+        plan, error = prepare_launch(game, use_proton_script, record=False)
+        if plan is None:
+            raise RuntimeError(error)
+        if not plan.wineprefix:
+            return
+
+        # A server of the old runner (its -p keepalive, say) would make wineboot
+        # fail with a version mismatch. Our own keepalive goes too, whatever its
+        # runner: "wineserver -w" below would otherwise wait out its -p timeout.
+        owner = keepalive_owner(plan.wineprefix)
+        if owner:
+            stop_wineserver(plan.wineprefix, owner)
+        else:
+            stop_foreign_wineserver(plan.wineprefix, plan.wineserver, previous_wineserver(previous))
+
+        env = {k: plan.env.value(k) for k in plan.env.keys()}
+        env["WINEDEBUG"] = "-all"
+        if os.path.basename(plan.program) == "proton":
+            command = [plan.program, "run", "wineboot", "-u"]
+        else:
+            command = [plan.program, "wineboot", "-u"]
+
+        self.job_started.emit(name, "Updating Wine prefix...")
+        started = time.monotonic()
+        proc = subprocess.Popen(_low_priority(command), env=env, cwd=plan.wineprefix,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while True:
+            try:
+                code = proc.wait(timeout=PROGRESS_INTERVAL_S)
+                break
+            except subprocess.TimeoutExpired:
+                self.job_progress.emit(name, f"Updating Wine prefix... {time.monotonic() - started:.0f}s")
+
+        if plan.wineserver:
+            # wineboot returns before the prefix's services settle. Bounded: a
+            # launch waiting on this job must not hang on a server that stays up.
+            try:
+                subprocess.run([plan.wineserver, "-w"], env=env, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=SETTLE_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                print(f"Prefix update for {name}: wineserver still running after {SETTLE_TIMEOUT_S}s")
+        if code != 0:
+            raise RuntimeError(f"wineboot exited with code {code}")
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def prepare_launch_when_ready(game, *args, **kwargs):
+    """``prepare_launch`` that first waits for a pending prefix update."""
+    get_prefix_updater().wait(game)
+    return prepare_launch(game, *args, **kwargs)
+
+
+_updater = None
+_updater_lock = threading.Lock()
+
+
+def get_prefix_updater():
+    global _updater
+    with _updater_lock:
+        if _updater is None:
+            _updater = PrefixUpdater()
+            app = QCoreApplication.instance()
+            if app is not None and QThread.currentThread() != app.thread():
+                _updater.moveToThread(app.thread())
+    return _updater
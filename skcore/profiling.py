@@ -0,0 +1,137 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from PySide6.QtCore import QObject, Signal, QTimer, QCoreApplication, QThread
+
+PROFILE_DIR = os.path.join("data", "profiles")
+SUMMARY_LINES = 25
+TRACEMALLOC_FRAMES = 10
+_IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"))
+
+
+def _output_path(kind, extension):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, time.strftime(f"{kind}-%Y%m%d-%H%M%S.{extension}"))
+
+
+class GuiProfiler(QObject):
+    """cProfile over the GUI thread for a fixed number of seconds.
+
+    Only the thread that calls ``start`` is profiled, which is the point:
+    it shows what the event loop spent its time on. The ``.pstats`` file
+    opens with ``python -m pstats`` or snakeviz.
+    """
+
+    finished = Signal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._profile = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.stop)
+
+    def is_running(self):
+        return self._profile is not None
+
+    def start(self, seconds):
+        if self._profile is not None:
+            return False
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler (or debugger) already owns the hook.
+            print(f"Profiler error: {e}")
+            self._profile = None
+            return False
+        self._timer.start(int(seconds * 1000))
+        return True
+
+    def stop(self):
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return None
+        self._timer.stop()
+        profile.disable()
+
+        path = _output_path("gui", "pstats")
+        profile.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+        self.finished.emit(path, out.getvalue())
+        return path
+
+
+class AllocationTracker:
+    """tracemalloc baseline and diff. Tracing slows every allocation, so it
+    runs only between ``mark`` and ``diff``."""
+
+    def __init__(self):
+        self._baseline = None
+        self._started_tracing = False
+
+    def is_marked(self):
+        return self._baseline is not None
+
+    def mark(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def diff(self, top=SUMMARY_LINES):
+        """Top allocation sites by growth since ``mark``; saved to data/profiles/."""
+        if self._baseline is None:
+            return None, "No baseline; take one first."
+        current = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        baseline, self._baseline = self._baseline, None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+        stats = current.compare_to(baseline, "lineno")
+        growth = sum(s.size_diff for s in stats)
+        lines = [f"Net change: {growth / 1024:+.1f} KiB in {sum(s.count_diff for s in stats):+d} blocks", ""]
+        lines += [str(s) for s in stats[:top]]
+        text = "\n".join(lines)
+
+        path = _output_path("alloc", "txt")
+        with open(path, "w") as f:
+            f.write(text + "\n\nTracebacks of the largest growth:\n")
+            for s in current.compare_to(baseline, "traceback")[:5]:
+                f.write(f"\n{s.size_diff / 1024:+.1f} KiB, {s.count_diff:+d} blocks\n")
+                f.write("\n".join(s.traceback.format()) + "\n")
+        return path, text
+
+
+_profiler = None
+_tracker = None
+_lock = threading.Lock()
+
+
+def get_gui_profiler():
+    global _profiler
+    with _lock:
+        if _profiler is None:
+            _profiler = GuiProfiler()
+            app = QCoreApplication.instance()
+            if app is not None and QThread.currentThread() != app.thread():
+                _profiler.moveToThread(app.thread())
+    return _profiler
+
+
+def get_allocation_tracker():
+    global _tracker
+    with _lock:
+        if _tracker is None:
+            _tracker = AllocationTracker()
+    return _tracker
@@ -1,27 +1,59 @@
 import os
-import requests
+import re
 import stat
 
 RUNNERS_DIR = os.path.abspath(os.path.join("data", "runners"))
 CUSTOM_RUNNERS_DIR = os.path.join(RUNNERS_DIR, "custom")
 
+CHECKSUM_SUFFIXES = {".sha512sum": "sha512", ".sha256sum": "sha256"}
+GITHUB_API = "https://api.github.com"
+
 os.makedirs(CUSTOM_RUNNERS_DIR, exist_ok=True)
 
 def get_runner_versions(runner_type):
     if runner_type in ["System", "Custom"]: return []
+
+    import requests
+    from skcore import net
     
     repo = "GloriousEggroll/proton-ge-custom" if runner_type == "Proton" else "Kron4ek/Wine-Builds"
     try:
-        r = requests.get(f"https://api.github.com/repos/{repo}/releases", timeout=10)
+        r = net.get(f"{GITHUB_API}/repos/{repo}/releases",
+                    headers={"Accept": "application/vnd.github+json"}, timeout=(5, 10))
         if r.status_code == 200:
-            return [{"name": rel['tag_name'],
-                     "url": next(a['browser_download_url'] for a in rel['assets'] if
-                                 a['name'].endswith(('.tar.gz', '.tar.xz'))),
-                     "filename": next(a['name'] for a in rel['assets'] if a['name'].endswith(('.tar.gz', '.tar.xz')))}
-                    for rel in r.json() if rel['assets']]
-    except: pass
+            versions = []
+            for rel in r.json():
+                archive = next((a for a in rel['assets'] if a['name'].endswith(('.tar.gz', '.tar.xz'))), None)
+                if archive:
+                    entry = {"name": rel['tag_name'],
+                             "url": archive['browser_download_url'],
+                             "filename": archive['name'],
+                             "size": archive.get('size', 0)}
+                    for a in rel['assets']:
+                        algo = CHECKSUM_SUFFIXES.get(os.path.splitext(a['name'])[1])
+                        if algo:
+                            entry["checksum_url"] = a['browser_download_url']
+                            entry["checksum_algo"] = algo
+                            break
+                    versions.append(entry)
+            return versions
+        print(f"Runner list error: GitHub returned {r.status_code} for {repo}")
+    except (requests.RequestException, ValueError, KeyError) as e:
+        print(f"Runner list error: {e}")
     return []
 
+def parse_checksum(text, filename):
+    """Pull the digest for ``filename`` out of a ``sha*sum``-style listing."""
+    fallback = None
+    for line in text.splitlines():
+        parts = line.strip().split()
+        if not parts or not re.fullmatch(r"[0-9a-fA-F]{64,128}", parts[0]):
+            continue
+        if len(parts) > 1 and os.path.basename(parts[-1].lstrip("*")) == filename:
+            return parts[0].lower()
+        fallback = fallback or parts[0].lower()
+    return fallback
+
 def is_runner_installed(runner_type, version_name):
     if runner_type == "System": return True
     path = os.path.join(CUSTOM_RUNNERS_DIR if runner_type == "Custom" else os.path.join(RUNNERS_DIR, runner_type.lower()), version_name)
@@ -34,7 +66,7 @@ def set_executable_permissions(path):
             try:
                 st = os.stat(p)
                 os.chmod(p, st.st_mode | stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH)
-            except: pass
+            except OSError: pass
 
 def get_runner_executable(game):
     r_type = game.get("runner_type", "System")
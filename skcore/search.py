@@ -0,0 +1,167 @@
+import re
+import unicodedata
+
+# Names are trigram-indexed. The other fields are scanned: a linear "in"
+# over 50k short strings costs a few ms, far less than keeping postings for
+# every description trigram or for the handful of runner types.
+SCANNED_FIELDS = ("description", "runner_type", "version")
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Casefold and strip accents so "Pokémon" matches "pokemon"."""
+    text = str(text or "")
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefixes(text):
+    found = set()
+    for word in _WORD.findall(text):
+        found.add(word[:1])
+        found.add(word[:2])
+    return found
+
+
+class LibraryIndex:
+    """In-memory search index over the game library.
+
+    A term of three or more characters matches as a substring of the name,
+    description, runner type or version; shorter terms match the start of a
+    word in the name. Every term must match. Games are keyed by identity, so
+    callers ``update`` a game after editing it in place. Typing more
+    characters narrows the previous result instead of searching again.
+    """
+
+    def __init__(self, games=()):
+        self.games = {}
+        self.names = {}
+        self.details = {}
+        self.sort_keys = {}
+        self.trigrams = {}
+        self.prefixes = {}
+        self._order = None
+        self._rank = {}
+        self._last = ((), None)
+        self.rebuild(games)
+
+    def _changed(self):
+        self._order = None
+        self._last = ((), None)
+
+    def rebuild(self, games):
+        for table in (self.games, self.names, self.details, self.sort_keys, self.trigrams, self.prefixes):
+            table.clear()
+        for game in games:
+            self.add(game)
+        self._changed()
+
+    def _postings(self, key):
+        name = self.names[key]
+        return ((self.trigrams, _trigrams(name)), (self.prefixes, _prefixes(name)))
+
+    def add(self, game):
+        key = id(game)
+        if key in self.games:
+            self.remove(game)
+
+        self.games[key] = game
+        self.names[key] = self.sort_keys[key] = normalize(game.get("name", ""))
+        self.details[key] = "\n".join(normalize(game.get(f, "")) for f in SCANNED_FIELDS)
+
+        for table, items in self._postings(key):
+            for item in items:
+                bucket = table.get(item)
+                if bucket is None:
+                    table[item] = bucket = set()
+                bucket.add(key)
+        self._changed()
+
+    def remove(self, game):
+        key = id(game)
+        if key not in self.games:
+            return
+
+        for table, items in self._postings(key):
+            for item in items:
+                bucket = table.get(item)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del table[item]
+
+        for table in (self.games, self.names, self.details, self.sort_keys):
+            table.pop(key, None)
+        self._changed()
+
+    def update(self, game):
+        self.add(game)
+
+    def sort_key(self, game):
+        key = self.sort_keys.get(id(game))
+        return key if key is not None else normalize(game.get("name", ""))
+
+    def sorted(self, games):
+        return sorted(games, key=self.sort_key)
+
+    def _match_term(self, term, within=None):
+        if len(term) < 3:
+            found = self.prefixes.get(term, set())
+            return found & within if within is not None else set(found)
+
+        grams = sorted((self.trigrams.get(g, set()) for g in _trigrams(term)), key=len)
+        found = grams[0].intersection(*grams[1:]) if grams[0] else set()
+        if within is not None:
+            found &= within
+        if len(term) > 3:
+            names = self.names
+            found = {k for k in found if term in names[k]}
+
+        details = self.details
+        if within is None:
+            found.update(k for k, d in details.items() if term in d)
+        else:
+            found.update(k for k in within if term in details[k])
+        return found
+
+    def match_keys(self, query):
+        """Identity keys of games matching every whitespace-separated term,
+        or ``None`` when the query is empty (everything matches)."""
+        terms = normalize(query).split()
+        if not terms:
+            self._last = ((), None)
+            return None
+
+        # Each old term is a substring of its successor, so the new matches
+        # are a subset of the old ones. Prefix-matched short terms don't nest.
+        last_terms, within = self._last
+        if not (last_terms and all(len(t) >= 3 for t in last_terms) and len(terms) >= len(last_terms)
+                and all(old in new for old, new in zip(last_terms, terms))):
+            within = None
+
+        result = within
+        for term in sorted(terms, key=len, reverse=True):
+            result = self._match_term(term, result)
+            if not result:
+                break
+
+        self._last = (tuple(terms), result)
+        return result
+
+    def search(self, query):
+        """Matching games in library order (by cached name key)."""
+        if self._order is None:
+            self._order = sorted(self.games, key=self.sort_keys.__getitem__)
+            self._rank = {k: i for i, k in enumerate(self._order)}
+        keys = self.match_keys(query)
+        if keys is None:
+            keys = self._order
+        else:
+            keys = sorted(keys, key=self._rank.__getitem__)
+        return [self.games[k] for k in keys]
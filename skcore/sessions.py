@@ -0,0 +1,246 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from skcore.launcher import keepalive_pid
+from skcore.metrics import get_metrics
+
+TERM_GRACE_S = 5.0
+WINESERVER_GRACE_S = 2.0
+KILL_GRACE_S = 1.0
+EXIT_GRACE_S = 1.5
+POLL_S = 0.05
+
+
+def _stat(pid):
+    """``(state, session)`` of ``pid`` from /proc, or ``None`` if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name is parenthesised and may itself contain ") ".
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+        return fields[0].decode(), int(fields[3])
+    except (IndexError, ValueError):
+        return None
+
+
+def _wineprefix(pid):
+    try:
+        with open(f"/proc/{pid}/environ", "rb") as f:
+            env = f.read()
+    except OSError:
+        return None
+    for entry in env.split(b"\0"):
+        if entry.startswith(b"WINEPREFIX="):
+            return os.fsdecode(entry[11:])
+    return None
+
+
+def _signal(pids, sig):
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+        except PermissionError as e:
+            print(f"Signal {sig} to {pid} error: {e}")
+
+
+class GameSession:
+    """A launched game and every process it leaves behind.
+
+    The game is started as the leader of a new session, so anything it
+    spawns (``explorer.exe``, ``winedevice.exe``, the game itself) shares
+    its session id even after being reparented. The wineserver detaches
+    into a session of its own and is found through its ``WINEPREFIX``,
+    except for a keepalive server (``wineserver -p``), which outlives the
+    game on purpose and is left alone. Where the process could not be made
+    a session leader only the process itself and its prefix are matched,
+    never the launcher's own session.
+    """
+
+    def __init__(self, name, pid, plan):
+        self.name = name
+        self.pid = pid
+        self.running = True
+        info = _stat(pid)
+        self.leader = info is not None and info[1] == pid
+        self.wineprefix = os.path.realpath(plan.wineprefix) if plan.wineprefix else None
+        self.wineserver = plan.wineserver
+        self.env = {k: plan.env.value(k) for k in plan.env.keys()}
+
+    def processes(self):
+        """Live (non-zombie) pids that belong to this session, from /proc."""
+        me = os.getpid()
+        keepalive = keepalive_pid(self.wineprefix) if self.wineprefix else None
+        found = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            if pid == me or pid == keepalive:
+                continue
+            info = _stat(pid)
+            if info is None or info[0] == "Z":
+                continue
+            if pid == self.pid or (self.leader and info[1] == self.pid):
+                found.append(pid)
+            elif self.wineprefix:
+                prefix = _wineprefix(pid)
+                if prefix and os.path.realpath(prefix) == self.wineprefix:
+                    found.append(pid)
+        return found
+
+    def _wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            left = self.processes()
+            if not left or time.monotonic() >= deadline:
+                return left
+            time.sleep(POLL_S)
+
+    def _kill_wineserver(self):
+        # "-k" would take down a keepalive server shared with the next launch.
+        if not self.wineserver or not self.wineprefix or keepalive_pid(self.wineprefix):
+            return False
+        try:
+            subprocess.run([self.wineserver, "-k"], env=self.env, timeout=WINESERVER_GRACE_S,
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"wineserver -k error: {e}")
+        return True
+
+    def stop(self, grace=TERM_GRACE_S):
+        """SIGTERM, then ``wineserver -k``, then SIGKILL. Returns the pids
+        still alive afterwards (empty when the teardown was complete)."""
+        left = self.processes()
+        if not left:
+            return []
+
+        _signal(left, signal.SIGTERM)
+        left = self._wait(grace)
+        if not left:
+            return []
+
+        if self._kill_wineserver():
+            left = self._wait(WINESERVER_GRACE_S)
+            if not left:
+                return []
+
+        _signal(left, signal.SIGKILL)
+        left = self._wait(KILL_GRACE_S)
+        if left:
+            print(f"Session {self.name}: processes survived SIGKILL: {left}")
+        return left
+
+
+class SessionManager:
+    """Live game sessions, keyed by the pid of the launched process.
+
+    A session counts as live from ``register`` until its launched process
+    exits (``mark_exited``); it stays tracked for teardown while anything
+    it left behind is still running. Listeners get the live count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def live_count(self):
+        with self._lock:
+            return sum(1 for s in self._sessions.values() if s.running)
+
+    def _notify(self):
+        live = self.live_count()
+        for callback in list(self._listeners):
+            callback(live)
+
+    def register(self, name, pid, plan):
+        session = GameSession(name, pid, plan)
+        with self._lock:
+            self._sessions[pid] = session
+        self._notify()
+        return session
+
+    def unregister(self, pid):
+        with self._lock:
+            session = self._sessions.pop(pid, None)
+        if session is not None and session.running:
+            self._notify()
+        return session
+
+    def mark_exited(self, pid):
+        with self._lock:
+            session = self._sessions.get(pid)
+            if session is None or not session.running:
+                return
+            session.running = False
+        self._notify()
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def reap(self):
+        """Forget sessions with no process left; returns the ones still alive."""
+        alive = []
+        for session in self.sessions():
+            if session.processes():
+                alive.append(session)
+            else:
+                self.unregister(session.pid)
+        return alive
+
+    def stop(self, pid, grace=TERM_GRACE_S):
+        with self._lock:
+            session = self._sessions.get(pid)
+        if session is None:
+            return []
+        left = session.stop(grace)
+        if not left:
+            self.unregister(pid)
+        return left
+
+    def stop_all(self, grace=EXIT_GRACE_S):
+        """Tear down every session in parallel; used when the launcher exits."""
+        results = {}
+        threads = []
+        for session in self.sessions():
+            def run(s=session):
+                results[s.pid] = s.stop(grace)
+            thread = threading.Thread(target=run, name=f"sk-stop-{session.pid}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        for pid, left in results.items():
+            if not left:
+                self.unregister(pid)
+        return results
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionManager()
+            get_metrics().add_collector(_collect_metrics)
+    return _manager
+
+
+def _collect_metrics(registry):
+    registry.gauge("game_sessions_live", "Games whose launched process is running").set(_manager.live_count())
+    registry.gauge("game_sessions_tracked", "Sessions kept for teardown").set(len(_manager.sessions()))
@@ -0,0 +1,115 @@
+import sys
+import time
+from importlib.abc import MetaPathFinder, Loader
+
+_report = None
+
+
+class _TimedLoader(Loader):
+    def __init__(self, loader, report):
+        self.loader = loader
+        self.report = report
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.report.begin_import(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.report.end_import(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _ImportTimer(MetaPathFinder):
+    """Wraps every loader so ``exec_module`` time is recorded, like ``-X importtime``."""
+
+    def __init__(self, report):
+        self.report = report
+        self._busy = False
+
+    def find_spec(self, fullname, path, target=None):
+        if self._busy:
+            return None
+        self._busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self.report)
+                    return spec
+            return None
+        finally:
+            self._busy = False
+
+
+class StartupReport:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.last = self.t0
+        self.phases = []
+        self.imports = []
+        self._stack = []
+        self._finder = None
+        self.finished = False
+
+    def install_import_timer(self):
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def remove_import_timer(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def begin_import(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def end_import(self, name):
+        name, start, children = self._stack.pop()
+        total = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += total
+        self.imports.append((name, total - children, total, len(self._stack)))
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last, now - self.t0))
+        self.last = now
+
+    def format(self, top=25):
+        lines = ["", "=== SK Player startup report ===", f"{'phase':<28}{'step ms':>10}{'total ms':>10}"]
+        for phase, step, total in self.phases:
+            lines.append(f"{phase:<28}{step * 1000:>10.1f}{total * 1000:>10.1f}")
+
+        lines += ["", f"import time (top {top} by cumulative, -X importtime style)",
+                  f"{'self us':>10} | {'cumulative':>10} | module"]
+        for name, own, total, depth in sorted(self.imports, key=lambda i: i[2], reverse=True)[:top]:
+            lines.append(f"{own * 1e6:>10.0f} | {total * 1e6:>10.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+def enable():
+    global _report
+    _report = StartupReport()
+    _report.install_import_timer()
+    return _report
+
+
+def mark(phase):
+    if _report is not None and not _report.finished:
+        _report.mark(phase)
+
+
+def finish():
+    if _report is None or _report.finished:
+        return
+    _report.mark("startup complete")
+    _report.finished = True
+    _report.remove_import_timer()
+    print(_report.format())
@@ -0,0 +1,175 @@
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal, QTimer, QCoreApplication, QThread
+
+from skcore import trace
+from skcore.metrics import get_metrics
+
+TASK_WORKERS = 4
+HEARTBEAT_MS = 100
+
+
+class TaskExecutor(QObject):
+    """Runs blocking disk/network work on a thread pool and hands the result
+    back to the GUI thread.
+
+    ``on_done(result)`` and ``on_error(message)`` are called in the thread
+    the executor lives in (the GUI thread). ``submit_latest`` coalesces work
+    per key: while a write is queued, newer calls only swap its arguments, so
+    a burst of edits costs one ``save_games``, always with the newest data.
+    """
+
+    _done = Signal(object, object)
+    _error = Signal(object, str)
+
+    def __init__(self, max_workers=TASK_WORKERS, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sk-task")
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._lanes = {}
+        self._done.connect(self._deliver)
+        self._error.connect(self._deliver)
+
+    @staticmethod
+    def _deliver(callback, value):
+        if callback is not None:
+            callback(value)
+
+    def _run(self, fn, args, kwargs, on_done, on_error):
+        try:
+            with trace.span(getattr(fn, "__qualname__", str(fn)), cat="task"):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Task {getattr(fn, '__name__', fn)} error: {e}")
+            self._error.emit(on_error, str(e))
+        else:
+            self._done.emit(on_done, result)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        return self._pool.submit(self._run, fn, args, kwargs, on_done, on_error)
+
+    def submit_latest(self, key, fn, *args, on_done=None, on_error=None, **kwargs):
+        with self._lock:
+            self._latest[key] = (fn, args, kwargs, on_done, on_error)
+            if self._lanes.get(key):
+                return
+            self._lanes[key] = True
+        self._pool.submit(self._drain, key)
+
+    def _drain(self, key):
+        # One lane per key keeps writes to the same file in order.
+        while True:
+            with self._lock:
+                item = self._latest.pop(key, None)
+                if item is None:
+                    self._lanes[key] = False
+                    return
+            self._run(*item)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+class StallDetector(QObject):
+    """Reports GUI-thread stalls with a stack sample of where the thread is stuck.
+
+    A GUI-thread timer stamps a heartbeat every ``HEARTBEAT_MS``; a watchdog
+    thread checks the stamp and, once it is older than ``threshold_ms``,
+    prints the GUI thread's current Python stack. The stall's full length is
+    printed when the heartbeat resumes.
+    """
+
+    def __init__(self, threshold_ms, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.stalls = 0
+        self.worst = 0.0
+        self._beat = time.monotonic()
+        self._stalled_since = None
+        self._gui_ident = threading.get_ident()
+        self._stop = threading.Event()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(HEARTBEAT_MS)
+        self._timer.timeout.connect(self._heartbeat)
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        stalled_since = self._stalled_since
+        if stalled_since is not None:
+            self._stalled_since = None
+            length = now - stalled_since
+            self.worst = max(self.worst, length)
+            print(f"Event loop stall ended after {length * 1000:.0f} ms")
+        self._beat = now
+
+    def _watch(self, stop):
+        interval = max(0.01, min(self.threshold / 2, HEARTBEAT_MS / 1000))
+        while not stop.wait(interval):
+            late = time.monotonic() - self._beat - HEARTBEAT_MS / 1000
+            if late < self.threshold or self._stalled_since is not None:
+                continue
+            self._stalled_since = self._beat + HEARTBEAT_MS / 1000
+            self.stalls += 1
+            frame = sys._current_frames().get(self._gui_ident)
+            stack = "".join(traceback.format_stack(frame)) if frame else "  <no Python frame>\n"
+            print(f"Event loop stalled for more than {self.threshold * 1000:.0f} ms, GUI thread at:\n{stack}", end="")
+
+    def start(self):
+        if self._timer.isActive():
+            return
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._timer.start()
+        threading.Thread(target=self._watch, args=(self._stop,), name="sk-stall-detector", daemon=True).start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        self._stalled_since = None
+
+
+_executor = None
+_detector = None
+_lock = threading.Lock()
+
+
+def get_task_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+            app = QCoreApplication.instance()
+            if app is not None and QThread.currentThread() != app.thread():
+                _executor.moveToThread(app.thread())
+    return _executor
+
+
+def start_stall_detector(threshold_ms):
+    """Start (or restart with a new threshold) the GUI-thread watchdog. ``0`` turns it off."""
+    global _detector
+    if _detector is not None:
+        _detector.stop()
+        _detector = None
+    if threshold_ms > 0:
+        _detector = StallDetector(threshold_ms)
+        _detector.start()
+    return _detector
+
+
+def get_stall_detector():
+    return _detector
+
+
+def _collect_metrics(registry):
+    if _detector is not None:
+        registry.gauge("event_loop_stalls", "GUI event-loop stalls over the threshold").set(_detector.stalls)
+        registry.gauge("event_loop_worst_stall_seconds", "Longest GUI event-loop stall").set(_detector.worst)
+
+
+get_metrics().add_collector(_collect_metrics)
@@ -0,0 +1,159 @@
+import ctypes
+import ctypes.util
+import os
+import platform
+import threading
+from contextlib import contextmanager
+
+from PySide6.QtCore import QObject, Signal, QCoreApplication, QThread
+
+from skcore.config import get_settings_service
+from skcore.sessions import get_session_manager
+
+IDLE_NICE = 19
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_CLASS_BE = 2
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_BE_NORMAL = 4
+_SYS_IOPRIO_SET = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "armv7l": 314, "riscv64": 30}
+
+_libc = None
+
+
+def _syscall():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            _libc = False
+    return _libc.syscall if _libc else None
+
+
+def set_io_idle(tid, idle=True):
+    """Move thread ``tid`` to the idle I/O class, or back to best-effort."""
+    number = _SYS_IOPRIO_SET.get(platform.machine())
+    syscall = _syscall()
+    if number is None or syscall is None:
+        return False
+    prio = (_IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT) if idle \
+        else (_IOPRIO_CLASS_BE << _IOPRIO_CLASS_SHIFT) | _IOPRIO_BE_NORMAL
+    return syscall(number, _IOPRIO_WHO_PROCESS, tid, prio) == 0
+
+
+def set_cpu_nice(tid, nice):
+    """Per-thread on Linux. Raising priority back usually needs CAP_SYS_NICE,
+    so restoring can fail; the thread then finishes its job at idle."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, nice)
+        return True
+    except OSError:
+        return False
+
+
+class BackgroundThrottle(QObject):
+    """Makes launcher background work yield while any game session is live.
+
+    Worker threads run their job inside ``worker()``; while a game runs they
+    are moved to nice 19 and the idle I/O class, including ones already
+    running when the game starts. Non-urgent jobs ask ``defer(key, fn)``
+    first and are replayed on the GUI thread once the last session exits.
+    The download manager caps its concurrency and bandwidth off ``changed``.
+    """
+
+    changed = Signal(bool)
+    _sessions_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.active = False
+        self._lock = threading.Lock()
+        self._workers = {}
+        self._deferred = {}
+        self._sessions_changed.connect(self._on_sessions_changed)
+        get_settings_service().changed.connect(self._on_settings_changed)
+        # Listeners fire on whichever thread registered or reaped a session.
+        get_session_manager().add_listener(self._sessions_changed.emit)
+
+    def enabled(self):
+        return get_settings_service().get("background_throttle", True)
+
+    def _on_settings_changed(self, changed):
+        if "background_throttle" in changed:
+            self._on_sessions_changed(get_session_manager().live_count())
+
+    def _on_sessions_changed(self, live):
+        active = live > 0 and self.enabled()
+        if active == self.active:
+            return
+        with self._lock:
+            self.active = active
+            workers = dict(self._workers)
+        for tid, nice in workers.items():
+            self._apply(tid, nice, active)
+        self.changed.emit(active)
+        if not active:
+            self._run_deferred()
+
+    @staticmethod
+    def _apply(tid, nice, throttled):
+        set_cpu_nice(tid, IDLE_NICE if throttled else nice)
+        set_io_idle(tid, throttled)
+
+    @contextmanager
+    def worker(self):
+        """Register the calling thread as background work for the block."""
+        tid = threading.get_native_id()
+        try:
+            nice = os.getpriority(os.PRIO_PROCESS, tid)
+        except OSError:
+            nice = 0
+        with self._lock:
+            self._workers[tid] = nice
+            throttled = self.active
+        if throttled:
+            self._apply(tid, nice, True)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._workers.pop(tid, None)
+                throttled = self.active
+            if throttled:
+                # Pool threads outlive the job; give them their I/O class back.
+                set_io_idle(tid, False)
+
+    def defer(self, key, fn):
+        """Hold ``fn`` until no game runs. Returns True when it was deferred;
+        a later call with the same key replaces the held one."""
+        with self._lock:
+            if not self.active:
+                return False
+            self._deferred[key] = fn
+        return True
+
+    def _run_deferred(self):
+        with self._lock:
+            pending = list(self._deferred.values())
+            self._deferred.clear()
+        for fn in pending:
+            try:
+                fn()
+            except Exception as e:
+                print(f"Deferred job error: {e}")
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_background_throttle():
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = BackgroundThrottle()
+            app = QCoreApplication.instance()
+            if app is not None and QThread.currentThread() != app.thread():
+                _throttle.moveToThread(app.thread())
+    return _throttle
@@ -0,0 +1,158 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+TRACE_DIR = os.path.join("data", "traces")
+
+_tracer = None
+_NULL = contextlib.nullcontext()
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+class Tracer:
+    """Collects Chrome trace events (``chrome://tracing``, ui.perfetto.dev).
+
+    ``list.append`` is atomic, so threads record without a lock. Thread
+    names are captured the first time a thread records, because worker
+    threads are often gone by the time the trace is written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.events = []
+        self.threads = {}
+        self._lock = threading.Lock()
+        self.written = False
+
+    def _tid(self):
+        tid = threading.get_native_id()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        return tid
+
+    def add(self, ph, name, cat, args=None, **fields):
+        event = {"ph": ph, "name": name, "cat": cat, "ts": _now_us(), "pid": self.pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        event.update(fields)
+        self.events.append(event)
+        return event
+
+    @contextlib.contextmanager
+    def span(self, name, cat, args):
+        event = self.add("X", name, cat, args)
+        try:
+            yield event
+        finally:
+            event["dur"] = _now_us() - event["ts"]
+
+    def write(self):
+        with self._lock:
+            if self.written:
+                return None
+            self.written = True
+        meta = [{"ph": "M", "name": "thread_name", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self.threads.items()]
+        meta.append({"ph": "M", "name": "process_name", "pid": self.pid, "args": {"name": "SK Player"}})
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def enable(path=None):
+    """Start recording; the trace is written on ``finish`` or at exit."""
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    if not path:
+        path = os.path.join(TRACE_DIR, time.strftime("sk-trace-%Y%m%d-%H%M%S.json"))
+    _tracer = Tracer(path)
+    atexit.register(finish)
+    return _tracer
+
+
+def enable_from_environment(settings=None):
+    """``SK_TRACE=1`` (default path) or ``SK_TRACE=/path/trace.json``, or the
+    ``trace_enabled`` developer setting."""
+    value = os.environ.get("SK_TRACE", "")
+    if value and value != "0":
+        return enable(None if value == "1" else value)
+    if settings and settings.get("trace_enabled", False):
+        return enable()
+    return None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def finish():
+    if _tracer is None:
+        return None
+    try:
+        path = _tracer.write()
+    except OSError as e:
+        print(f"Trace write error: {e}")
+        return None
+    if path:
+        print(f"Trace written to {path} ({len(_tracer.events)} events)")
+    return path
+
+
+def span(name, cat="app", **args):
+    """Time a block on the calling thread. A shared no-op when disabled."""
+    if _tracer is None:
+        return _NULL
+    return _tracer.span(name, cat, args)
+
+
+def traced(name=None, cat="app"):
+    """Decorator form of ``span``, named after the function by default."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _tracer.span(label, cat, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def begin(name, cat="app", **args):
+    if _tracer is not None:
+        _tracer.add("B", name, cat, args)
+
+
+def end(name, cat="app", **args):
+    if _tracer is not None:
+        _tracer.add("E", name, cat, args)
+
+
+def instant(name, cat="app", **args):
+    if _tracer is not None:
+        _tracer.add("i", name, cat, args, s="t")
+
+
+def async_begin(name, flow_id, cat="flow", **args):
+    """Start of a flow that ends on another thread or a later callback."""
+    if _tracer is not None:
+        _tracer.add("b", name, cat, args, id=str(flow_id))
+
+
+def async_end(name, flow_id, cat="flow", **args):
+    if _tracer is not None:
+        _tracer.add("e", name, cat, args, id=str(flow_id))
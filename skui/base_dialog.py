@@ -1,6 +1,7 @@
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QWidget, QGraphicsDropShadowEffect
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QWidget
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QPalette
+from skui.chrome import WindowShadow, performance_mode
 from skui.title_bar import CustomTitleBar
 
 
@@ -9,7 +10,7 @@ class BaseFramelessDialog(QDialog):
         super().__init__(parent)
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Dialog)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TranslucentBackground, not performance_mode())
 
         pal = self.palette()
         pal.setColor(QPalette.Highlight, QColor(0, 0, 0, 0))
@@ -30,11 +31,7 @@ class BaseFramelessDialog(QDialog):
             }
         """)
 
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(40)
-        shadow.setOffset(0, 0)
-        shadow.setColor(QColor(0, 0, 0, 180))
-        self.container.setGraphicsEffect(shadow)
+        self.window_shadow = WindowShadow(self, self.container)
 
         self.main_layout.addWidget(self.container)
 
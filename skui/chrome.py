@@ -0,0 +1,99 @@
+from PySide6.QtCore import QObject, QEvent, QRectF, Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap
+
+from skcore.config import get_settings_service
+
+SHADOW_BLUR = 60
+SHADOW_COLOR = QColor(0, 0, 0, 220)
+
+_tiles = {}
+
+
+def performance_mode():
+    """Opaque windows, square corners and no shadow. Translucency is fixed
+    when a window is created, so that part applies to windows opened later."""
+    return get_settings_service().get("performance_mode", False)
+
+
+def shadow_tile(radius, blur=SHADOW_BLUR, color=SHADOW_COLOR, device_pixel_ratio=1.0):
+    """9-slice source for a rounded-rect shadow: ``blur + radius`` corners
+    around a one pixel stretchable middle. Rendered once per key."""
+    key = (radius, blur, color.rgba(), device_pixel_ratio)
+    tile = _tiles.get(key)
+    if tile is not None:
+        return tile
+
+    edge = blur + radius
+    side = round((2 * edge + 1) * device_pixel_ratio)
+    image = QImage(side, side, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    painter.scale(device_pixel_ratio, device_pixel_ratio)
+    painter.setPen(Qt.NoPen)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    inner = QRectF(blur, blur, 2 * radius + 1, 2 * radius + 1)
+    # Each ring overwrites the wider one, giving a quadratic fall-off.
+    for d in range(blur, -1, -1):
+        shade = QColor(color)
+        shade.setAlphaF(color.alphaF() * (1 - d / blur) ** 2 if blur else color.alphaF())
+        painter.setBrush(shade)
+        painter.drawRoundedRect(inner.adjusted(-d, -d, d, d), radius + d, radius + d)
+    painter.end()
+
+    tile = QPixmap.fromImage(image)
+    _tiles[key] = tile
+    return tile
+
+
+def draw_shadow(painter, rect, radius, device_pixel_ratio=1.0, blur=SHADOW_BLUR, color=SHADOW_COLOR):
+    """Stretch the cached tile around ``rect``. The middle slice is skipped;
+    whatever casts the shadow covers it."""
+    tile = shadow_tile(radius, blur, color, device_pixel_ratio)
+    edge = blur + radius
+    src_edge = round(edge * device_pixel_ratio)
+    src_mid = tile.width() - 2 * src_edge
+
+    outer = QRectF(rect).adjusted(-blur, -blur, blur, blur)
+    xs = [outer.left(), outer.left() + edge, outer.right() - edge, outer.right()]
+    ys = [outer.top(), outer.top() + edge, outer.bottom() - edge, outer.bottom()]
+    src = [0, src_edge, src_edge + src_mid, 2 * src_edge + src_mid]
+
+    for i in range(3):
+        for j in range(3):
+            if i == 1 and j == 1:
+                continue
+            target = QRectF(xs[i], ys[j], xs[i + 1] - xs[i], ys[j + 1] - ys[j])
+            if target.width() <= 0 or target.height() <= 0:
+                continue
+            source = QRectF(src[i], src[j], src[i + 1] - src[i], src[j + 1] - src[j])
+            painter.drawPixmap(target, tile, source)
+
+
+class WindowShadow(QObject):
+    """Paints a drop shadow behind ``container`` on its translucent window.
+
+    Replaces a ``QGraphicsDropShadowEffect`` on the container, which renders
+    the whole subtree offscreen and blurs it again on every child repaint.
+    """
+
+    def __init__(self, window, container, radius=20):
+        super().__init__(window)
+        self.window = window
+        self.container = container
+        self.radius = radius
+        self.enabled = True
+        window.installEventFilter(self)
+
+    def set_enabled(self, enabled):
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.window.update()
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint and self.enabled \
+                and self.window.testAttribute(Qt.WA_TranslucentBackground):
+            painter = QPainter(self.window)
+            draw_shadow(painter, self.container.geometry(), self.radius, self.window.devicePixelRatioF())
+            painter.end()
+        return False
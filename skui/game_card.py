@@ -1,33 +1,47 @@
+import os
+
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel
-from PySide6.QtGui import QPixmap, QPainter, QPainterPath
-from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtCore import Qt
+
+from skui.image_cache import get_pixmap_cache
 
+PLACEHOLDER_COLOR = QColor("#151515")
 
 class RoundedLabel(QLabel):
-    def __init__(self, pixmap, radius=15):
+    """Paints a banner fetched from the shared pixmap cache at its own size.
+
+    Only the path is kept here, so a card that is never painted (or whose
+    image was released) costs no pixmap memory. Corners come pre-cut from
+    the cache, so a paint is a single blit. Until the banner is decoded
+    (off the GUI thread) a plain rounded placeholder is painted instead.
+    """
+
+    def __init__(self, path, radius=15):
         super().__init__()
-        self.pixmap = pixmap
+        self.path = path
         self.radius = radius
+        self.image_loaded = False
         self.setAttribute(Qt.WA_TranslucentBackground)
 
-    def paintEvent(self, event):
-        if self.pixmap.isNull():
-            super().paintEvent(event)
-            return
-
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing, True)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+    def release(self):
+        if self.image_loaded:
+            get_pixmap_cache().release(self.path)
+            self.image_loaded = False
 
+    def paintEvent(self, event):
         rect = self.rect()
-        
-        path = QPainterPath()
-        path.addRoundedRect(QRectF(rect), self.radius, self.radius)
-
-        painter.setClipPath(path)
-
-        scaled_pix = self.pixmap.scaled(rect.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-        painter.drawPixmap(rect, scaled_pix)
+        pixmap = get_pixmap_cache().get(self.path, rect.size(), self.devicePixelRatioF(), self.radius,
+                                        on_ready=self.update)
+        painter = QPainter(self)
+        if pixmap.isNull():
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(PLACEHOLDER_COLOR)
+            painter.drawRoundedRect(rect, self.radius, self.radius)
+            return
+        self.image_loaded = True
+        painter.drawPixmap(rect, pixmap)
 
 
 class GameCard(QFrame):
@@ -53,10 +67,10 @@ class GameCard(QFrame):
         layout.setContentsMargins(4, 4, 4, 4)
         self.setFixedSize(self.W, self.H)
 
-        pix = QPixmap(self.game.get("banner", ""))
+        banner = self.game.get("banner", "")
 
-        if not pix.isNull():
-            self.img_lbl = RoundedLabel(pix, radius=15)
+        if banner and os.path.isfile(banner):
+            self.img_lbl = RoundedLabel(banner, radius=15)
         else:
             self.img_lbl = QLabel("NO IMAGE")
             self.img_lbl.setAlignment(Qt.AlignCenter)
@@ -65,6 +79,10 @@ class GameCard(QFrame):
         layout.addWidget(self.img_lbl)
         self.update_style()
 
+    def release_image(self):
+        if isinstance(self.img_lbl, RoundedLabel):
+            self.img_lbl.release()
+
     def update_selection_color(self, color):
         self.selection_color = color
         self.update_style()
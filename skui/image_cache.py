@@ -0,0 +1,166 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QRectF, QSize, Qt
+from PySide6.QtGui import QImage, QImageReader, QPainter, QPainterPath, QPixmap
+
+from skcore.config import get_settings_service
+from skcore.metrics import get_metrics, histogram
+from skcore.tasks import get_task_executor
+
+DEFAULT_BUDGET_MB = 64
+
+
+class PixmapCache:
+    """LRU of card-sized pixmaps under a byte budget. GUI thread only.
+
+    Cards never own their decoded banner; they ask for it at paint time, so
+    memory is bounded by the budget rather than by the library size. A miss
+    never reads the disk on the GUI thread: the file is decoded on the task
+    executor and the caller is told to repaint once it is cached.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._unreadable = set()
+        self._pending = {}
+
+    @staticmethod
+    def _cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    def get(self, path, size, device_pixel_ratio=1.0, radius=0, on_ready=None):
+        """Return ``path`` scaled to ``size`` logical pixels if it is cached,
+        else a null pixmap while it is decoded in the background; ``on_ready()``
+        is called once it can be fetched.
+
+        With ``radius`` the corners are cut once, at decode time, so painting
+        the result needs no clip path.
+        """
+        width = max(1, round(size.width() * device_pixel_ratio))
+        height = max(1, round(size.height() * device_pixel_ratio))
+        key = (path, width, height, radius)
+
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return pixmap
+        if key in self._unreadable:
+            return QPixmap()
+
+        waiting = self._pending.get(key)
+        if waiting is None:
+            self.misses += 1
+            waiting = self._pending[key] = []
+            get_task_executor().submit(_decode, path, width, height, radius * device_pixel_ratio,
+                                       on_done=lambda image: self._decoded(key, device_pixel_ratio, image),
+                                       on_error=lambda _message: self._decoded(key, device_pixel_ratio, None))
+        if on_ready is not None and on_ready not in waiting:
+            waiting.append(on_ready)
+        return QPixmap()
+
+    def _decoded(self, key, device_pixel_ratio, image):
+        waiting = self._pending.pop(key, [])
+        if image is None or image.isNull():
+            self._unreadable.add(key)
+            return
+
+        # QPixmap is GUI-thread only; the worker hands over a QImage.
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self._items[key] = pixmap
+        self.used_bytes += self._cost(pixmap)
+        self._evict()
+
+        for callback in waiting:
+            try:
+                callback()
+            except RuntimeError:
+                # The card was deleted (grid rebuilt) while its banner decoded.
+                pass
+
+    def release(self, path):
+        self._unreadable = {k for k in self._unreadable if k[0] != path}
+        for key in [k for k in self._items if k[0] == path]:
+            self.used_bytes -= self._cost(self._items.pop(key))
+            self.evictions += 1
+
+    def clear(self):
+        self.evictions += len(self._items)
+        self._items.clear()
+        self._unreadable.clear()
+        self.used_bytes = 0
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self._evict()
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and len(self._items) > 1:
+            _, pixmap = self._items.popitem(last=False)
+            self.used_bytes -= self._cost(pixmap)
+            self.evictions += 1
+
+    def stats(self):
+        return {"entries": len(self._items), "used_bytes": self.used_bytes,
+                "budget_bytes": self.budget_bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "pending": len(self._pending)}
+
+
+def _decode(path, width, height, radius):
+    with histogram("image_decode_seconds", "Banner decode, scale and corner rounding").time():
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        reader.setScaledSize(QSize(width, height))
+        image = reader.read()
+        if image.isNull():
+            return image
+
+        if image.width() != width or image.height() != height:
+            image = image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        if radius:
+            image = _round_corners(image, radius)
+    return image
+
+
+def _round_corners(image, radius):
+    rounded = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    rounded.fill(Qt.transparent)
+
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(rounded.rect()), radius, radius)
+
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, image)
+    painter.end()
+    return rounded
+
+
+_cache = None
+
+
+def _on_settings_changed(changed):
+    if "pixmap_cache_mb" in changed:
+        _cache.set_budget(changed["pixmap_cache_mb"] * 1024 * 1024)
+
+
+def get_pixmap_cache():
+    global _cache
+    if _cache is None:
+        settings = get_settings_service()
+        _cache = PixmapCache(settings.get("pixmap_cache_mb", DEFAULT_BUDGET_MB) * 1024 * 1024)
+        settings.changed.connect(_on_settings_changed)
+        get_metrics().add_collector(_collect_metrics)
+    return _cache
+
+
+def _collect_metrics(registry):
+    for key, value in _cache.stats().items():
+        registry.gauge(f"pixmap_cache_{key}", "Card pixmap cache statistics").set(value)
@@ -1,25 +1,47 @@
-import os, shutil
+import os, time
+from collections import deque
 from datetime import datetime
 
 from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QScrollArea,
-    QLabel, QPushButton, QTextEdit, QFileDialog,
-    QDialog, QFrame, QGraphicsDropShadowEffect,
+    QLabel, QPushButton, QTextEdit, QFileDialog, QLineEdit,
+    QDialog, QFrame,
     QSystemTrayIcon, QMenu, QStyle, QApplication, QSizePolicy
 )
-from PySide6.QtCore import Qt, QProcess, Signal
-from PySide6.QtGui import QColor, QPalette, QIcon, QAction
+from PySide6.QtCore import Qt, QProcess, Signal, QTimer, QObject
+from PySide6.QtGui import QColor, QPalette, QIcon, QAction, QPixmapCache
 
+from skcore import startup
 from skcore.database import load_games, save_games
-from skcore.launcher import launch_game
-from skcore.config import load_settings
-
+from skcore.launcher import start_launch, prewarm_wineserver
+from skcore.prefixes import get_prefix_updater, prepare_launch_when_ready
+from skcore.config import get_settings_service
+from skcore.banners import ingest_banner, remove_unreferenced_banners
+from skcore.memory import trim_memory, rss_bytes
+from skcore.metrics import export_configured, gauge, histogram
+from skcore.search import LibraryIndex
+from skcore.sessions import get_session_manager
+from skcore.throttle import get_background_throttle
+from skcore import trace
+from skcore.tasks import get_task_executor, get_stall_detector, start_stall_detector
+
+from skui.chrome import WindowShadow, performance_mode
 from skui.game_card import GameCard
-from skui.edit_dialog import EditGameDialog
-from skui.theme_dialog import ThemeDialog
+from skui.image_cache import get_pixmap_cache
 from skui.title_bar import CustomTitleBar
-from skui.settings_dialog import SettingsDialog
-from skui.runnerversion_dialog import RunnerVersionDialog
+
+# Dialogs, the updater, the download manager and the runner manifest (and
+# through them requests/tarfile) are imported on first use so they stay off
+# the path to the first frame.
+
+UPDATE_CHECK_DELAY_MS = 8000
+GRID_BATCH_SIZE = 40
+# Cards further than this many viewport widths from the visible area give
+# their banner back to the pixmap cache; it is decoded again when scrolled to.
+OFFSCREEN_RELEASE_SCREENS = 2
+OFFSCREEN_RELEASE_DELAY_MS = 200
+# Game output kept while hidden; replayed into the log on restore.
+LOW_RESOURCE_LOG_LINES = 200
 
 class ClickableLabel(QLabel):
     clicked = Signal()
@@ -32,12 +54,19 @@ class ClickableLabel(QLabel):
         if event.button() == Qt.LeftButton:
             self.clicked.emit()
 
+class BannerSignals(QObject):
+    ready = Signal(object, str)
+    failed = Signal(str)
+
+class IndexSignals(QObject):
+    ready = Signal(object, int)
+
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TranslucentBackground, not performance_mode())
 
         pal = self.palette()
         pal.setColor(QPalette.Highlight, QColor(0, 0, 0, 0))
@@ -54,25 +83,139 @@ class MainWindow(QWidget):
         self.lib_color = "#eeeeee"
         self.title_bar_color = "#050505"
 
-        self.games = load_games()
+        self.games = []
+        # False until finish_startup has read games.json successfully.
+        self.library_loaded = False
+        self.cards = []
         self.selected_game = None
-
-        self.app_settings = {}
-        self.load_user_settings()
-
-        self.setup_system_tray()
+        self.tray_icon = None
+        self.startup_done = False
+        self.grid_generation = 0
+        self.notified_version = None
+        self.low_resource = False
+        self.pending_update_check = False
+        self.held_output = deque(maxlen=LOW_RESOURCE_LOG_LINES)
+        self.library_index = LibraryIndex()
+        self.index_generation = 0
+        self.index_pending = False
+        self.filter_keys = None
+        self.launch_pending = False
+
+        self.settings = get_settings_service()
+        self.app_settings = self.settings.all()
+        self.settings.changed.connect(self.on_settings_changed)
+
+        self.banner_signals = BannerSignals()
+        self.banner_ingests = 0
+        self.banner_signals.ready.connect(self.on_banner_ready)
+        self.banner_signals.failed.connect(self.on_banner_failed)
+
+        self.index_signals = IndexSignals()
+        self.index_signals.ready.connect(self.on_index_ready)
+
+        prefix_updater = get_prefix_updater()
+        prefix_updater.job_started.connect(lambda name, status: self.log(f"{name}: {status}"))
+        prefix_updater.job_progress.connect(self.on_prefix_progress)
+        prefix_updater.job_finished.connect(lambda name, status: self.log(f"{name}: {status}"))
+        prefix_updater.job_failed.connect(lambda name, error: self.log(f"Prefix update failed for {name}: {error}"))
 
         self.process = QProcess(self)
+        self.process.started.connect(self.on_game_started)
         self.process.finished.connect(self.on_game_closed)
+        self.launch_plan = None
+        self.launch_seq = 0
+        self.game_pid = 0
+        QApplication.instance().aboutToQuit.connect(self.end_sessions)
+        get_background_throttle().changed.connect(self.on_throttle_changed)
+
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.export_metrics)
+        self.configure_metrics_export()
         self.process.readyReadStandardOutput.connect(self.read_output)
 
         self.init_ui()
         self.apply_theme()
-        self.refresh_grid()
+        # Margins, corners and shadow for the current mode (performance mode at startup).
+        self.title_bar.update_radius_shadow()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.startup_done:
+            self.startup_done = True
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Everything not needed for the first frame, run once the shell is on screen."""
+        startup.mark("first frame")
 
-    def load_user_settings(self):
-        self.app_settings = load_settings()
-        print(f"DEBUG: Settings Reloaded -> {self.app_settings}")
+        games = load_games(strict=True)
+        self.library_loaded = games is not None
+        self.games = games or []
+        startup.mark("load_games")
+
+        self.refresh_grid(incremental=True)
+        self.build_index()
+
+        self.setup_system_tray()
+
+        from setting.updater import get_update_checker
+
+        # Connected once; deferred and replayed checks only call check().
+        get_update_checker().finished.connect(self.on_update_checked)
+        QTimer.singleShot(UPDATE_CHECK_DELAY_MS, self.auto_check_updates)
+        QTimer.singleShot(0, self.scan_runners)
+
+    def scan_runners(self):
+        if self.low_resource or get_background_throttle().defer("scan_runners", self.scan_runners):
+            return
+
+        from skcore.manifest import get_runner_manifest
+
+        manifest = get_runner_manifest()
+        manifest.update_references(self.games)
+        manifest.refresh_async()
+
+    def on_settings_changed(self, changed):
+        self.app_settings.update(changed)
+        if "stall_threshold_ms" in changed:
+            start_stall_detector(changed["stall_threshold_ms"])
+        if "performance_mode" in changed:
+            self.title_bar.update_radius_shadow()
+        if "metrics_export_interval_s" in changed:
+            self.configure_metrics_export()
+
+    def configure_metrics_export(self):
+        interval = self.app_settings.get("metrics_export_interval_s", 0)
+        if interval > 0:
+            self.metrics_timer.start(interval * 1000)
+        else:
+            self.metrics_timer.stop()
+
+    def export_metrics(self):
+        get_task_executor().submit_latest("metrics", export_configured, dict(self.app_settings))
+
+    def notify(self, message, msecs=2000):
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("SK Player", message, QSystemTrayIcon.Information, msecs)
+
+    def auto_check_updates(self):
+        if self.low_resource:
+            self.pending_update_check = True
+            return
+        if get_background_throttle().defer("update_check", self.auto_check_updates):
+            return
+
+        from setting.updater import get_update_checker, updates_disabled
+
+        if self.app_settings.get("check_updates", True) and not updates_disabled():
+            get_update_checker().check()
+
+    def on_update_checked(self, result):
+        if not result["available"] or result["latest"] == self.notified_version:
+            return
+        self.notified_version = result["latest"]
+        self.log(f"Update {result['latest']} available - open Settings to install.")
+        self.notify(f"Version {result['latest']} is available", 5000)
 
     def setup_system_tray(self):
         self.tray_icon = QSystemTrayIcon(self)
@@ -91,6 +234,7 @@ class MainWindow(QWidget):
 
         self.tray_icon.setContextMenu(tray_menu)
         self.tray_icon.activated.connect(self.on_tray_icon_activated)
+        self.tray_icon.messageClicked.connect(self.show_window)
         self.tray_icon.show()
 
     def on_tray_icon_activated(self, reason):
@@ -98,9 +242,57 @@ class MainWindow(QWidget):
             self.show_window()
 
     def show_window(self):
+        self.leave_low_resource_mode()
         self.showNormal()
         self.activateWindow()
 
+    def enter_low_resource_mode(self):
+        """Drop everything the hidden window can rebuild: card widgets, decoded
+        banners, the drop shadow, timers and log rendering."""
+        if self.low_resource or not self.isHidden():
+            return
+        self.low_resource = True
+        rss_before = rss_bytes()
+
+        self.release_timer.stop()
+        if get_stall_detector() is not None:
+            get_stall_detector().stop()
+        self.grid_generation += 1
+        self.clear_layout(self.grid_layout)
+        self.cards = []
+        self.window_shadow.set_enabled(False)
+
+        get_pixmap_cache().clear()
+        QPixmapCache.clear()
+        # deleteLater() needs a turn of the event loop before memory is freed.
+        QTimer.singleShot(0, lambda: self.finish_low_resource_mode(rss_before))
+
+    def finish_low_resource_mode(self, rss_before):
+        if not self.low_resource:
+            return
+        trim_memory()
+        rss_after = rss_bytes()
+        gauge("low_resource_rss_before_bytes", "RSS when the window was last hidden").set(rss_before)
+        gauge("low_resource_rss_after_bytes", "RSS after releasing memory for the hidden window").set(rss_after)
+
+    def leave_low_resource_mode(self):
+        if not self.low_resource:
+            return
+        self.low_resource = False
+
+        if get_stall_detector() is not None:
+            get_stall_detector().start()
+        self.title_bar.update_radius_shadow()
+        self.refresh_grid(incremental=True)
+
+        if self.held_output:
+            self.log(f"<span style='color:#555'>[Output] {'<br>'.join(self.held_output)}</span>")
+            self.held_output.clear()
+
+        if self.pending_update_check:
+            self.pending_update_check = False
+            QTimer.singleShot(UPDATE_CHECK_DELAY_MS, self.auto_check_updates)
+
     def init_ui(self):
         self.root_layout = QVBoxLayout(self)
         self.root_layout.setContentsMargins(20, 20, 20, 20)
@@ -117,11 +309,7 @@ class MainWindow(QWidget):
             }
         """)
 
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(60)
-        shadow.setOffset(0, 0)
-        shadow.setColor(QColor(0, 0, 0, 220))
-        self.container.setGraphicsEffect(shadow)
+        self.window_shadow = WindowShadow(self, self.container)
 
         self.main_v_layout = QVBoxLayout(self.container)
         self.main_v_layout.setContentsMargins(0, 0, 0, 0)
@@ -178,7 +366,18 @@ class MainWindow(QWidget):
                     font-size:16px; font-weight:bold; text-transform:uppercase;
                     margin-left:10px; background:transparent;
                 """)
-        right_panel.addWidget(self.library_header)
+        header_row = QHBoxLayout()
+        header_row.addWidget(self.library_header)
+        header_row.addStretch()
+
+        self.search_box = QLineEdit()
+        self.search_box.setObjectName("search_box")
+        self.search_box.setPlaceholderText("Search library...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedWidth(260)
+        self.search_box.textChanged.connect(self.apply_filter)
+        header_row.addWidget(self.search_box)
+        right_panel.addLayout(header_row)
 
         self.grid_container = QWidget()
         self.grid_container.setObjectName("GridContainer")
@@ -218,6 +417,12 @@ class MainWindow(QWidget):
         self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
+        self.release_timer = QTimer(self)
+        self.release_timer.setSingleShot(True)
+        self.release_timer.setInterval(OFFSCREEN_RELEASE_DELAY_MS)
+        self.release_timer.timeout.connect(self.release_offscreen_cards)
+        self.scroll.horizontalScrollBar().valueChanged.connect(self.release_timer.start)
+
         right_panel.addWidget(self.scroll, 1)
 
         self.info_frame = QFrame()
@@ -282,6 +487,7 @@ class MainWindow(QWidget):
         self.btn_theme.clicked.connect(self.open_theme_settings)
         self.btn_settings.clicked.connect(self.open_settings)
 
+    @trace.traced("MainWindow.apply_theme", cat="ui")
     def apply_theme(self):
         current_title_color = getattr(self, "title_bar_color", "#050505")
 
@@ -319,6 +525,18 @@ class MainWindow(QWidget):
                 border: 1px solid #151515;
             }}
 
+            QLineEdit#search_box {{
+                background: {self.btn_color};
+                border: 1px solid #1a1a1a;
+                border-radius: 10px;
+                padding: 6px 12px;
+                color: #ccc;
+            }}
+
+            QLineEdit#search_box:focus {{
+                border: 1px solid {self.accent_color};
+            }}
+
             QPushButton#side_btn {{
                 background: {self.btn_color};
                 border-radius: 10px;
@@ -443,17 +661,89 @@ class MainWindow(QWidget):
                 }}
             """)
 
-        self.refresh_grid()
+        self.update_card_colors()
+
+    def update_card_colors(self):
+        for card in self.cards:
+            card.update_selection_color(self.select_color)
+            card.set_selected(card.game is self.selected_game)
+
+    def save_library(self):
+        """Write games.json from the task executor. Each game is copied here so
+        the worker never serializes a dict the UI is editing."""
+        get_task_executor().submit_latest(
+            "games", save_games, [dict(g) for g in self.games],
+            on_error=lambda e: self.log(f"Error saving library: {e}"))
+
+    def build_index(self):
+        """Index the library on a worker thread; the search box works once it lands."""
+        self.index_generation += 1
+        self.index_pending = True
+        generation, games = self.index_generation, list(self.games)
+        # Coalesced: a build still queued is replaced by this newer one.
+        get_task_executor().submit_latest(
+            "library_index", LibraryIndex, games,
+            on_done=lambda index: self.index_signals.ready.emit(index, generation),
+            on_error=lambda e: self.log(f"Error indexing library: {e}"))
+
+    def on_index_ready(self, index, generation):
+        if generation != self.index_generation:
+            return
+        self.index_pending = False
+        self.library_index = index
+        if self.search_box.text():
+            self.apply_filter(self.search_box.text())
+
+    def index_changed(self, game, removed=False):
+        # A build still running would not see this edit; start it over instead.
+        if self.index_pending:
+            self.build_index()
+            return
+        if removed:
+            self.library_index.remove(game)
+        else:
+            self.library_index.update(game)
+        # An added or renamed game may now match (or stop matching) the search.
+        if self.search_box.text():
+            self.apply_filter()
+
+    def apply_filter(self, text=None):
+        """Show only the cards matching the search box. Widgets are hidden,
+        not rebuilt, so each keystroke costs an index lookup and a few
+        visibility flips."""
+        if text is None:
+            text = self.search_box.text()
+        self.filter_keys = self.library_index.match_keys(text)
+        changed = [card for card in self.cards
+                   if card.isHidden() == (self.filter_keys is None or id(card.game) in self.filter_keys)]
+        if not changed:
+            return
 
-        if self.selected_game:
-            try:
-                for i, g in enumerate(self.games):
-                    if g.get('path') == self.selected_game.get('path'):
-                        if i < len(self.cards):
-                            self.cards[i].set_selected(True)
-                        break
-            except Exception:
-                pass
+        # Showing a child of a visible widget re-runs the row layout each
+        # time; flip them while the container is hidden and lay out once.
+        self.grid_container.setUpdatesEnabled(False)
+        self.grid_container.hide()
+        for card in changed:
+            card.setVisible(card.isHidden())
+        self.grid_container.show()
+        self.grid_container.setUpdatesEnabled(True)
+        self.scroll.horizontalScrollBar().setValue(0)
+
+    def release_offscreen_cards(self):
+        left = self.scroll.horizontalScrollBar().value()
+        width = self.scroll.viewport().width()
+        margin = width * OFFSCREEN_RELEASE_SCREENS
+        far, near_banners = [], set()
+        for card in self.cards:
+            x = card.x()
+            if x + card.width() < left - margin or x > left + width + margin:
+                far.append(card)
+            else:
+                near_banners.add(card.game.get("banner"))
+
+        for card in far:
+            if card.game.get("banner") not in near_banners:
+                card.release_image()
 
     def log(self, msg):
         self.logs.append(f"<b>[{datetime.now():%H:%M:%S}]</b> {msg}")
@@ -486,9 +776,18 @@ class MainWindow(QWidget):
 
         self.lbl_desc.setText(card.game.get("description", ""))
 
+        keepalive = self.app_settings.get("wineserver_keepalive_s", 0)
+        if keepalive > 0 and self.process.state() == QProcess.NotRunning:
+            get_task_executor().submit(prewarm_wineserver, dict(card.game), keepalive,
+                                       self.app_settings.get("proton_script_launch", False))
+
     def read_output(self):
-        out = self.process.readAllStandardOutput().data().decode().strip()
-        if out: self.log(f"<span style='color:#555'>[Output] {out}</span>")
+        out = self.process.readAllStandardOutput().data().decode(errors="replace").strip()
+        if not out: return
+        if self.low_resource:
+            self.held_output.extend(out.splitlines())
+        else:
+            self.log(f"<span style='color:#555'>[Output] {out}</span>")
 
     def clear_layout(self, layout):
         if layout is None:
@@ -501,40 +800,47 @@ class MainWindow(QWidget):
             elif item.layout() is not None:
                 self.clear_layout(item.layout())
 
-    def refresh_grid(self):
+    @trace.traced("MainWindow.refresh_grid", cat="ui")
+    def refresh_grid(self, incremental=False):
+        """Rebuild the library rows.
+
+        With ``incremental`` the rows are laid out empty and cards are added in
+        batches of ``GRID_BATCH_SIZE`` from the event loop, so a large library
+        never holds up a frame.
+        """
+        if self.low_resource:
+            return
+
+        start = time.perf_counter()
+        self.grid_generation += 1
         self.clear_layout(self.grid_layout)
         self.cards = []
 
         self.grid_layout.setSpacing(2)
 
-        sorted_games = sorted(self.games, key=lambda g: g["name"].lower())
+        sorted_games = self.library_index.sorted(self.games)
 
         wide_games = [g for g in sorted_games if g.get("banner_type") == "wide"]
         long_games = [g for g in sorted_games if g.get("banner_type") != "wide"]
 
-        def create_horizontal_row(games_list):
+        def create_horizontal_row():
             row_layout = QHBoxLayout()
             row_layout.setSpacing(15)
             row_layout.setAlignment(Qt.AlignLeft)
-
-            for g in games_list:
-                card = GameCard(g, self.on_select)
-                if hasattr(self, "select_color"):
-                    card.update_selection_color(self.select_color)
-                self.cards.append(card)
-                row_layout.addWidget(card)
-
             row_layout.addStretch()
             return row_layout
 
+        pending = []
+
         if wide_games:
             lbl = QLabel("FEATURED")
             lbl.setStyleSheet(
                 "font-size: 10px; font-weight:bold; color:#555; margin-left:5px; background: transparent; border: none;")
             self.grid_layout.addWidget(lbl)
 
-            wide_row = create_horizontal_row(wide_games)
+            wide_row = create_horizontal_row()
             self.grid_layout.addLayout(wide_row)
+            pending += [(wide_row, g) for g in wide_games]
 
             if long_games:
                 self.grid_layout.addSpacing(2)
@@ -545,26 +851,53 @@ class MainWindow(QWidget):
                 "font-size: 10px; font-weight:bold; color:#555; margin-left:5px; background: transparent; border: none;")
             self.grid_layout.addWidget(lbl)
 
-            long_row = create_horizontal_row(long_games)
+            long_row = create_horizontal_row()
             self.grid_layout.addLayout(long_row)
+            pending += [(long_row, g) for g in long_games]
 
         self.grid_layout.addStretch()
 
+        if incremental:
+            self.add_cards(pending, self.grid_generation)
+        else:
+            self.add_cards(pending, None)
+        histogram("grid_refresh_seconds", "GUI-thread time of a library grid rebuild").observe(time.perf_counter() - start)
+
+    @trace.traced("MainWindow.add_cards", cat="ui")
+    def add_cards(self, pending, generation):
+        if generation is not None and generation != self.grid_generation:
+            return
+
+        batch = pending if generation is None else pending[:GRID_BATCH_SIZE]
+        for row_layout, g in batch:
+            card = GameCard(g, self.on_select)
+            card.update_selection_color(self.select_color)
+            if g is self.selected_game:
+                card.set_selected(True)
+            if self.filter_keys is not None and id(g) not in self.filter_keys:
+                card.hide()
+            self.cards.append(card)
+            row_layout.insertWidget(row_layout.count() - 1, card)
+
+        rest = pending[len(batch):]
+        if rest:
+            QTimer.singleShot(0, lambda: self.add_cards(rest, generation))
+        elif generation is not None:
+            startup.mark("grid populated")
+            startup.finish()
+
     def open_runner_selector(self):
         if not self.selected_game:
             return
 
         try:
+            from skui.runnerversion_dialog import RunnerVersionDialog
+
             dlg = RunnerVersionDialog(self)
 
+            # The in-memory library is authoritative (games.json is written
+            # behind it by the task executor), so there is nothing to reload.
             if dlg.exec() == QDialog.Accepted:
-                self.games = load_games()
-
-                for g in self.games:
-                    if g['path'] == self.selected_game['path']:
-                        self.selected_game = g
-                        break
-
                 version = self.selected_game.get('version', '1.0')
                 runner = self.selected_game.get('runner_type', 'System').upper()
                 
@@ -580,32 +913,27 @@ class MainWindow(QWidget):
                                               "Game Executables (*.exe *.sh *.bin *.x86_64);;All Files (*)")
         if not path: return
         name = os.path.splitext(os.path.basename(path))[0]
-        self.games.append(
-            {"name": name, "path": path, "banner": "", "banner_type": "long", "version": "1.0", "runner_type": "System",
-             "description": ""})
-        save_games(self.games)
+        game = {"name": name, "path": path, "banner": "", "banner_type": "long", "version": "1.0",
+                "runner_type": "System", "description": ""}
+        self.games.append(game)
+        self.index_changed(game)
+        self.save_library()
         self.refresh_grid()
 
     def edit(self):
         if not self.selected_game: return
 
+        from skui.edit_dialog import EditGameDialog
+
         dlg = EditGameDialog(self.selected_game, self)
         result = dlg.exec()
 
         if result == QDialog.Accepted:
-            save_games(self.games)
+            self.index_changed(self.selected_game)
+            self.save_library()
             self.refresh_grid()
 
-            try:
-                found_match = False
-                for i, g in enumerate(self.games):
-                    if g.get('path') == self.selected_game.get('path'):
-                        self.on_select(self.cards[i])
-                        found_match = True
-                        break
-                if not found_match:
-                    self.clear_selection()
-            except:
+            if not self.select_game(self.selected_game):
                 self.clear_selection()
 
         elif result == 2:
@@ -619,7 +947,8 @@ class MainWindow(QWidget):
 
             if game_to_remove:
                 self.games.remove(game_to_remove)
-                save_games(self.games)
+                self.index_changed(game_to_remove, removed=True)
+                self.save_library()
                 self.clear_selection()
                 self.refresh_grid()
 
@@ -630,32 +959,39 @@ class MainWindow(QWidget):
                                              "Images (*.png *.jpg *.jpeg *.webp)")
         if not src: return
 
-        os.makedirs("data/banners", exist_ok=True)
-
-        _, ext = os.path.splitext(src)
-
-        game_name = self.selected_game["name"]
-        new_filename = f"{game_name}{ext}"
-        dest = os.path.join("data/banners", new_filename)
+        game = self.selected_game
+        banner_type = game.get("banner_type", "long")
+        dpr = self.devicePixelRatioF()
+        self.log(f"Importing banner for {game['name']}...")
+        self.banner_ingests += 1
+        get_task_executor().submit(ingest_banner, src, banner_type, dpr,
+                                   on_done=lambda dest: self.banner_signals.ready.emit(game, dest),
+                                   on_error=self.banner_signals.failed.emit)
 
-        try:
-            shutil.copy2(src, dest)
+    def on_banner_ready(self, game, dest):
+        self.banner_ingests -= 1
+        game["banner"] = dest
+        self.save_library()
 
-            self.selected_game["banner"] = dest
-            save_games(self.games)
+        self.refresh_grid()
+        self.select_game(game)
 
-            self.refresh_grid()
+        # Only once every finished ingest is assigned to its game; a file
+        # written but not yet assigned would look unreferenced.
+        if self.banner_ingests == 0:
+            get_task_executor().submit_latest("banner_cleanup", remove_unreferenced_banners,
+                                              list(self.games), time.time())
 
-            try:
-                for i, g in enumerate(self.games):
-                    if g.get('path') == self.selected_game.get('path'):
-                        self.on_select(self.cards[i])
-                        break
-            except:
-                pass
+    def on_banner_failed(self, error_msg):
+        self.banner_ingests -= 1
+        self.log(f"Error setting banner: {error_msg}")
 
-        except Exception as e:
-            self.log(f"Error setting banner: {e}")
+    def select_game(self, game):
+        for card in self.cards:
+            if card.game is game:
+                self.on_select(card)
+                return True
+        return False
 
     def set_path(self):
         if not self.selected_game: return
@@ -663,56 +999,139 @@ class MainWindow(QWidget):
         path, _ = QFileDialog.getOpenFileName(self, "Select Executable", home_dir)
         if path:
             self.selected_game["path"] = path
-            save_games(self.games)
+            self.save_library()
 
     def open_theme_settings(self):
+        from skui.theme_dialog import ThemeDialog
+
         ThemeDialog(self).exec()
 
     def open_settings(self):
+        from skui.settings_dialog import SettingsDialog
+
         dlg = SettingsDialog(self)
         dlg.exec()
-        self.load_user_settings()
 
     def toggle_play(self):
         if not self.selected_game: return
 
         if self.process.state() == QProcess.Running:
-            self.process.terminate()
+            self.stop_game()
             return
 
-        ok, msg = launch_game(self.selected_game, self.process)
-        if ok:
+        if self.launch_pending: return
+        self.launch_pending = True
+        self.launch_seq += 1
+        trace.async_begin("launch", self.launch_seq, game=self.selected_game.get("name", ""))
+        self.play_btn.setEnabled(False)
+        if get_prefix_updater().is_busy(self.selected_game):
+            self.play_btn.setText("UPDATING...")
+            self.log("Waiting for the Wine prefix update to finish...")
+        get_task_executor().submit(prepare_launch_when_ready, dict(self.selected_game),
+                                   self.app_settings.get("proton_script_launch", False),
+                                   self.app_settings.get("wineserver_keepalive_s", 0),
+                                   on_done=self.on_launch_prepared, on_error=self.on_launch_failed)
+
+    def on_prefix_progress(self, name, status):
+        # Per-second ticks would flood the log; show them on the waiting button.
+        if self.launch_pending and self.selected_game and self.selected_game.get("name") == name:
+            self.play_btn.setText(f"UPDATING {status.rsplit(' ', 1)[-1]}")
+
+    def on_launch_failed(self, msg):
+        trace.async_end("launch", self.launch_seq, error=msg)
+        self.launch_pending = False
+        self.play_btn.setEnabled(True)
+        self.play_btn.setText("PLAY")
+        self.log(f"Error: {msg}")
+
+    def on_launch_prepared(self, result):
+        plan, msg = result
+        self.launch_pending = False
+        self.play_btn.setEnabled(True)
+        self.play_btn.setText("PLAY")
+
+        if plan is not None:
+            self.launch_plan = plan
+            start_launch(plan, self.process)
+            trace.instant("process start requested", cat="flow")
+
             self.play_btn.setText("STOP")
             self.play_btn.setStyleSheet("background:#c0392b;border-radius:20px;")
 
-            from skcore.config import load_settings
-            fresh_settings = load_settings()
-
-            should_minimize = fresh_settings.get("minimize_on_launch", False)
+            should_minimize = self.app_settings.get("minimize_on_launch", False)
 
             if should_minimize is True:
                 self.hide()
-                self.tray_icon.showMessage("SK Player", "Running in background", QSystemTrayIcon.Information, 2000)
+                self.notify("Running in background", 2000)
+                self.enter_low_resource_mode()
         else:
+            trace.async_end("launch", self.launch_seq, error=msg)
             self.log(f"Error: {msg}")
 
+    def on_game_started(self):
+        trace.async_end("launch", self.launch_seq)
+        if self.launch_plan is not None:
+            self.game_pid = self.process.processId()
+            get_session_manager().register(self.selected_game.get("name", "") if self.selected_game else "",
+                                           self.game_pid, self.launch_plan)
+            self.launch_plan = None
+
+    def on_throttle_changed(self, active):
+        if active:
+            self.log("Game running: background work throttled.")
+        else:
+            self.log("Background work restored.")
+
+    def stop_game(self):
+        pid = self.process.processId()
+        self.play_btn.setEnabled(False)
+        self.play_btn.setText("STOPPING...")
+        self.log("Stopping game...")
+        get_task_executor().submit(get_session_manager().stop, pid,
+                                   on_done=self.on_game_stopped, on_error=self.on_game_stop_failed)
+
+    def on_game_stopped(self, leftovers):
+        self.play_btn.setEnabled(True)
+        if leftovers:
+            self.log(f"Error: processes still running after STOP: {', '.join(map(str, leftovers))}")
+        else:
+            self.log("Game stopped.")
+        if self.process.state() != QProcess.NotRunning:
+            # Not a session leader (old Qt); let QProcess reap the child.
+            self.process.kill()
+
+    def on_game_stop_failed(self, msg):
+        self.play_btn.setEnabled(True)
+        self.log(f"Error: {msg}")
+        self.process.kill()
+
+    def end_sessions(self):
+        # Blocking is fine here: the event loop is already shutting down.
+        for pid, leftovers in get_session_manager().stop_all().items():
+            if leftovers:
+                print(f"Session {pid}: processes left running on exit: {leftovers}")
+        if self.metrics_timer.isActive():
+            export_configured(self.app_settings)
+
     def on_game_closed(self):
+        get_session_manager().mark_exited(self.game_pid)
+        get_task_executor().submit(get_session_manager().reap)
+
         self.play_btn.setText("PLAY")
+        self.play_btn.setStyleSheet("")
         self.apply_theme()
 
         if self.isHidden():
             self.show_window()
 
     def closeEvent(self, event):
-        from skcore.config import load_settings
-        fresh_settings = load_settings()
-
-        should_minimize = fresh_settings.get("minimize_to_tray_on_close", False)
+        should_minimize = self.app_settings.get("minimize_to_tray_on_close", False)
 
-        if should_minimize is True:
+        if should_minimize is True and self.tray_icon is not None:
             event.ignore()
             self.hide()
-            self.tray_icon.showMessage("SK Player", "Minimized to Tray", QSystemTrayIcon.Information, 1000)
+            self.notify("Minimized to Tray", 1000)
+            self.enter_low_resource_mode()
         else:
             event.accept()
             QApplication.instance().quit()
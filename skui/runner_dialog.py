@@ -1,20 +1,20 @@
 import os
-import threading
-import requests
-import tarfile
 from PySide6.QtWidgets import (QVBoxLayout, QLabel, QComboBox,
                                QPushButton, QProgressBar, QMessageBox, QHBoxLayout, QWidget)
 from PySide6.QtCore import Qt, Signal, QObject, Slot
 
-from skcore.runners import get_runner_versions, is_runner_installed, RUNNERS_DIR, set_executable_permissions
+from skcore.config import get_settings_service
+from skcore.runners import get_runner_versions, RUNNERS_DIR
+from skcore.manifest import get_runner_manifest, format_size
+from skcore.downloads import get_download_manager, PRIORITY_HIGH, QUEUED, PAUSED, CANCELLED
+from skcore.installer import submit_runner_install
+from skcore.prefixes import get_prefix_updater
+from skcore.tasks import get_task_executor
 from skui.base_dialog import BaseFramelessDialog
 
 
 class RunnerSignals(QObject):
-    progress = Signal(int)
-    finished = Signal(str)
     error = Signal(str)
-    status = Signal(str)
     versions_fetched = Signal(list)
 
 
@@ -31,11 +31,19 @@ class RunnerDialog(BaseFramelessDialog):
 
         self.signals = RunnerSignals()
         self.signals.versions_fetched.connect(self.on_versions_fetched)
-        self.signals.progress.connect(self.progress_bar_update)
-        self.signals.status.connect(self.status_update)
-        self.signals.finished.connect(self.on_download_finished)
         self.signals.error.connect(self.on_error)
 
+        self.manifest = get_runner_manifest()
+        self.manifest.refresh_async()
+
+        self.job_id = None
+        manager = get_download_manager()
+        manager.job_progress.connect(self.on_job_progress)
+        manager.job_status.connect(self.on_job_status)
+        manager.job_state.connect(self.on_job_state)
+        manager.job_finished.connect(self.on_job_finished)
+        manager.job_failed.connect(self.on_job_failed)
+
         self.apply_styles()
         self.available_versions_data = []
         self.setup_ui()
@@ -84,7 +92,11 @@ class RunnerDialog(BaseFramelessDialog):
 
         btns = QHBoxLayout()
         self.cancel_btn = QPushButton("Cancel")
-        self.cancel_btn.clicked.connect(self.reject)
+        self.cancel_btn.clicked.connect(self.handle_cancel)
+
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.handle_pause)
+        self.pause_btn.hide()
 
         self.apply_btn = QPushButton("Apply Settings")
         self.apply_btn.setObjectName("apply_btn")
@@ -92,6 +104,7 @@ class RunnerDialog(BaseFramelessDialog):
         self.apply_btn.clicked.connect(self.handle_apply)
 
         btns.addWidget(self.cancel_btn)
+        btns.addWidget(self.pause_btn)
         btns.addWidget(self.apply_btn)
         layout.addLayout(btns)
 
@@ -115,47 +128,50 @@ class RunnerDialog(BaseFramelessDialog):
         self.status_lbl.setStyleSheet("color: #e67e22; background: transparent;")
         self.apply_btn.setEnabled(False)
 
-        def fetch_task():
-            try:
-                versions = get_runner_versions(r_type)
-                self.signals.versions_fetched.emit(versions)
-            except Exception as e:
-                self.signals.error.emit(str(e))
-
-        threading.Thread(target=fetch_task, daemon=True).start()
+        get_task_executor().submit(get_runner_versions, r_type,
+                                   on_done=self.signals.versions_fetched.emit, on_error=self.signals.error.emit)
 
     def load_custom_runners(self):
         try:
-            if not os.path.exists(self.CUSTOM_RUNNERS_DIR):
-                os.makedirs(self.CUSTOM_RUNNERS_DIR)
-
-            folders = [f for f in os.listdir(self.CUSTOM_RUNNERS_DIR)
-                       if os.path.isdir(os.path.join(self.CUSTOM_RUNNERS_DIR, f))]
+            runners = self.manifest.runners("Custom")
 
-            if not folders:
+            if not runners:
                 self.status_lbl.setText("No custom runners found in data/runners/custom")
                 self.status_lbl.setStyleSheet("color: #e74c3c;")
                 self.apply_btn.setEnabled(False)
             else:
-                for folder in folders:
-                    self.ver_combo.addItem(folder, {"name": folder, "custom": True})
+                for r in runners:
+                    self.ver_combo.addItem(self.runner_label(r["version"], r), {"name": r["version"], "custom": True})
 
-                self.status_lbl.setText(f"Found {len(folders)} custom runners.")
+                self.status_lbl.setText(f"Found {len(runners)} custom runners.")
                 self.status_lbl.setStyleSheet("color: #27ae60;")
                 self.apply_btn.setEnabled(True)
 
         except Exception as e:
             self.on_error(f"Failed to load custom runners: {str(e)}")
 
+    def runner_label(self, name, entry):
+        if "size" not in entry:
+            return name
+        return f"{name} ({format_size(entry['size'])})"
+
     @Slot(list)
     def on_versions_fetched(self, versions):
         self.available_versions_data = versions
         self.ver_combo.clear()
         r_type = self.type_combo.currentText()
 
+        installed = {r["version"]: r for r in self.manifest.runners(r_type)}
+
         for v in versions:
-            installed = " (Installed)" if is_runner_installed(r_type, v['name']) else ""
-            self.ver_combo.addItem(f"{v['name']}{installed}", v)
+            entry = installed.get(v['name'])
+            if entry is None:
+                label = v['name']
+            elif "size" in entry:
+                label = f"{v['name']} (Installed, {format_size(entry['size'])})"
+            else:
+                label = f"{v['name']} (Installed)"
+            self.ver_combo.addItem(label, v)
 
         self.status_lbl.setText(f"Found {len(versions)} versions.")
         self.status_lbl.setStyleSheet("color: #27ae60; background: transparent;")
@@ -165,9 +181,7 @@ class RunnerDialog(BaseFramelessDialog):
         r_type = self.type_combo.currentText()
 
         if r_type == "System":
-            self.game["runner_type"] = "System"
-            self.game["runner_version"] = ""
-            self.accept()
+            self.set_runner("System", "")
             return
 
         selected_data = self.ver_combo.currentData()
@@ -177,54 +191,74 @@ class RunnerDialog(BaseFramelessDialog):
 
         v_name = selected_data['name']
 
-        if r_type == "Custom" or is_runner_installed(r_type, v_name):
-            self.game["runner_type"] = r_type
-            self.game["runner_version"] = v_name
-            self.accept()
+        if r_type == "Custom" or self.manifest.is_installed(r_type, v_name):
+            self.set_runner(r_type, v_name)
         else:
             self.start_download(r_type, selected_data)
 
     def start_download(self, r_type, v_data):
         self.apply_btn.setEnabled(False)
-        self.cancel_btn.setEnabled(False)
         self.type_combo.setEnabled(False)
         self.ver_combo.setEnabled(False)
+        self.progress_bar.setValue(0)
         self.progress_bar.show()
+        self.pause_btn.setText("Pause")
+        self.pause_btn.show()
 
-        def download_thread():
-            try:
-                version_dir = os.path.join(RUNNERS_DIR, r_type.lower(), v_data['name'])
-                os.makedirs(version_dir, exist_ok=True)
-                archive_path = os.path.join(RUNNERS_DIR, v_data['filename'])
-
-                self.signals.status.emit(f"Downloading {v_data['name']}...")
-                response = requests.get(v_data['url'], stream=True, timeout=20)
-                response.raise_for_status()
-
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-
-                with open(archive_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=1024 * 1024):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                percent = int((downloaded / total_size) * 100)
-                                self.signals.progress.emit(percent)
-
-                self.signals.status.emit("Extracting files...")
-                with tarfile.open(archive_path) as tar:
-                    tar.extractall(path=version_dir)
+        self.job_id = submit_runner_install(r_type, v_data, priority=PRIORITY_HIGH).id
 
-                set_executable_permissions(version_dir)
-                if os.path.exists(archive_path): os.remove(archive_path)
-                self.signals.finished.emit(v_data['name'])
-
-            except Exception as e:
-                self.signals.error.emit(str(e))
+    def handle_cancel(self):
+        if self.job_id:
+            get_download_manager().cancel(self.job_id)
+            return
+        self.reject()
 
-        threading.Thread(target=download_thread, daemon=True).start()
+    def handle_pause(self):
+        if not self.job_id:
+            return
+        manager = get_download_manager()
+        if manager.is_paused(self.job_id):
+            manager.resume(self.job_id)
+            self.pause_btn.setText("Pause")
+        else:
+            manager.pause(self.job_id)
+            self.pause_btn.setText("Resume")
+
+    @Slot(str, int)
+    def on_job_progress(self, job_id, val):
+        if job_id == self.job_id:
+            self.progress_bar_update(val)
+
+    @Slot(str, str)
+    def on_job_status(self, job_id, text):
+        if job_id == self.job_id:
+            self.status_update(text)
+
+    @Slot(str, str)
+    def on_job_state(self, job_id, state):
+        if job_id != self.job_id:
+            return
+        if state == PAUSED:
+            self.status_update("Download paused.")
+        elif state == QUEUED:
+            self.status_update("Waiting for other downloads...")
+        elif state == CANCELLED:
+            self.job_id = None
+            self.reset_controls()
+            self.status_lbl.setText("Download cancelled.")
+            self.status_lbl.setStyleSheet("color: #e67e22;")
+
+    @Slot(str, str)
+    def on_job_finished(self, job_id, path):
+        if job_id == self.job_id:
+            self.job_id = None
+            self.on_download_finished(get_download_manager().get(job_id).label)
+
+    @Slot(str, str)
+    def on_job_failed(self, job_id, error_msg):
+        if job_id == self.job_id:
+            self.job_id = None
+            self.on_error(error_msg)
 
     @Slot(int)
     def progress_bar_update(self, val):
@@ -236,17 +270,28 @@ class RunnerDialog(BaseFramelessDialog):
 
     @Slot(str)
     def on_download_finished(self, v_name):
-        self.game["runner_type"] = self.type_combo.currentText()
+        self.set_runner(self.type_combo.currentText(), v_name)
+
+    def set_runner(self, r_type, v_name):
+        previous = dict(self.game)
+        current = (self.game.get("runner_type", "System"), self.game.get("runner_version", ""))
+        self.game["runner_type"] = r_type
         self.game["runner_version"] = v_name
+        if current != (r_type, v_name):
+            get_prefix_updater().schedule(self.game, get_settings_service().get("proton_script_launch", False),
+                                          previous=previous)
         self.accept()
 
-    @Slot(str)
-    def on_error(self, error_msg):
+    def reset_controls(self):
         self.apply_btn.setEnabled(True)
-        self.cancel_btn.setEnabled(True)
         self.type_combo.setEnabled(True)
         self.ver_combo.setEnabled(True)
         self.progress_bar.hide()
+        self.pause_btn.hide()
+
+    @Slot(str)
+    def on_error(self, error_msg):
+        self.reset_controls()
         self.status_lbl.setText("Operation failed.")
         self.status_lbl.setStyleSheet("color: #c0392b;")
         QMessageBox.critical(self, "Error", f"An error occurred:\n{error_msg}")
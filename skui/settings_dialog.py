@@ -1,16 +1,26 @@
-from PySide6.QtWidgets import QVBoxLayout, QLabel, QCheckBox, QPushButton, QHBoxLayout, QLineEdit, QMessageBox
-from skcore.config import load_settings, save_settings
+import gc
+
+from PySide6.QtWidgets import (QVBoxLayout, QLabel, QCheckBox, QPushButton, QHBoxLayout, QLineEdit, QMessageBox,
+                               QSpinBox, QWidget)
+from PySide6.QtCore import Slot, QCoreApplication, QEvent
+from skcore.config import get_settings_service
+from skcore.database import load_games
+from skcore.manifest import get_runner_manifest, format_size
+from skcore.metrics import export_configured
+from skcore.profiling import get_gui_profiler, get_allocation_tracker
+from skcore.tasks import get_task_executor
 from skui.base_dialog import BaseFramelessDialog
-from setting.updater import manual_check
+from setting.updater import get_update_checker, show_update_result, updates_disabled
 
 DEV_ACCESS_CODE = "SK-DEV"
+GRID_LEAK_ROUNDS = 20
 
 
 class SettingsDialog(BaseFramelessDialog):
     def __init__(self, parent=None):
         super().__init__(parent, title="Global Settings")
         self.setFixedWidth(450)
-        self.current_settings = load_settings()
+        self.current_settings = get_settings_service().all()
 
         if "developer_mode" not in self.current_settings:
             self.current_settings["developer_mode"] = False
@@ -47,7 +57,7 @@ class SettingsDialog(BaseFramelessDialog):
                 border: 1px solid #27ae60;
             }
 
-            QLineEdit {
+            QLineEdit, QSpinBox {
                 background-color: #111;
                 border: 1px solid #333;
                 border-radius: 4px;
@@ -55,7 +65,7 @@ class SettingsDialog(BaseFramelessDialog):
                 color: #fff;
                 font-family: monospace;
             }
-            QLineEdit:focus {
+            QLineEdit:focus, QSpinBox:focus {
                 border: 1px solid #27ae60;
             }
 
@@ -116,12 +126,76 @@ class SettingsDialog(BaseFramelessDialog):
         self.check_updates.setChecked(self.current_settings.get("check_updates", True))
         layout.addWidget(self.check_updates)
 
+        self.check_performance = QCheckBox("Performance mode (no transparency or shadows)")
+        self.check_performance.setToolTip("Windows opened afterwards are fully opaque; restart to apply to the main window.")
+        self.check_performance.setChecked(self.current_settings.get("performance_mode", False))
+        layout.addWidget(self.check_performance)
+
+        layout.addWidget(QLabel("LAUNCHING"))
+
+        self.check_proton_script = QCheckBox("Start Proton games through the proton script")
+        self.check_proton_script.setToolTip("Uses <prefix>/pfx as the Wine prefix, like Steam does.")
+        self.check_proton_script.setChecked(self.current_settings.get("proton_script_launch", False))
+        layout.addWidget(self.check_proton_script)
+
+        keepalive_layout = QHBoxLayout()
+        lbl_keepalive = QLabel("Keep wineserver running after exit")
+        lbl_keepalive.setStyleSheet("font-size: 13px; font-weight: normal; color: #eee; margin-top:0;")
+        keepalive_layout.addWidget(lbl_keepalive)
+        self.spin_keepalive = QSpinBox()
+        self.spin_keepalive.setRange(0, 3600)
+        self.spin_keepalive.setSingleStep(60)
+        self.spin_keepalive.setSuffix(" s")
+        self.spin_keepalive.setSpecialValueText("Off")
+        self.spin_keepalive.setValue(int(self.current_settings.get("wineserver_keepalive_s", 0)))
+        keepalive_layout.addWidget(self.spin_keepalive)
+        layout.addLayout(keepalive_layout)
+
+        self.check_throttle = QCheckBox("Throttle background work while a game runs")
+        self.check_throttle.setToolTip("Downloads, extraction and scans drop to idle priority; update checks wait.")
+        self.check_throttle.setChecked(self.current_settings.get("background_throttle", True))
+        layout.addWidget(self.check_throttle)
+
+        layout.addWidget(QLabel("STORAGE"))
+
+        cache_layout = QHBoxLayout()
+        lbl_cache = QLabel("Runner archive cache")
+        lbl_cache.setStyleSheet("font-size: 13px; font-weight: normal; color: #eee; margin-top:0;")
+        cache_layout.addWidget(lbl_cache)
+        self.spin_cache = QSpinBox()
+        self.spin_cache.setRange(0, 1024 * 1024)
+        self.spin_cache.setSingleStep(512)
+        self.spin_cache.setSuffix(" MB")
+        self.spin_cache.setValue(int(self.current_settings.get("archive_cache_mb", 4096)))
+        cache_layout.addWidget(self.spin_cache)
+        layout.addLayout(cache_layout)
+
+        self.lbl_runner_usage = QLabel("")
+        self.lbl_runner_usage.setStyleSheet("font-size: 11px; color: #777; margin-top:0;")
+        layout.addWidget(self.lbl_runner_usage)
+
+        self.btn_prune = QPushButton("Remove Unused Runners")
+        self.btn_prune.clicked.connect(self.on_prune_clicked)
+        layout.addWidget(self.btn_prune)
+        self.update_runner_usage()
+
         layout.addWidget(QLabel("UPDATES"))
         self.btn_check_update = QPushButton("Check for Updates Now")
         self.btn_check_update.setObjectName("update_btn")
         self.btn_check_update.clicked.connect(self.on_check_update_clicked)
         layout.addWidget(self.btn_check_update)
 
+        layout.addWidget(QLabel("DIAGNOSTICS"))
+        self.btn_export_metrics = QPushButton("Export Metrics Now")
+        self.btn_export_metrics.setToolTip("Writes metrics_json_path and, if set, metrics_prometheus_path.")
+        self.btn_export_metrics.clicked.connect(self.on_export_metrics_clicked)
+        layout.addWidget(self.btn_export_metrics)
+
+        self.check_trace = QCheckBox("Record a performance trace from next start")
+        self.check_trace.setToolTip("Written to data/traces/ on exit; open it in ui.perfetto.dev. SK_TRACE=1 does the same once.")
+        self.check_trace.setChecked(self.current_settings.get("trace_enabled", False))
+        layout.addWidget(self.check_trace)
+
         layout.addWidget(QLabel("DEVELOPER ZONE"))
 
         dev_layout = QHBoxLayout()
@@ -142,6 +216,38 @@ class SettingsDialog(BaseFramelessDialog):
         self.lbl_dev_status.setStyleSheet("font-size: 11px; color: #777; margin-top:0;")
         layout.addWidget(self.lbl_dev_status)
 
+        self.dev_tools = QWidget()
+        tools_layout = QVBoxLayout(self.dev_tools)
+        tools_layout.setContentsMargins(0, 0, 0, 0)
+
+        profile_layout = QHBoxLayout()
+        lbl_profile = QLabel("Profile the GUI thread for")
+        lbl_profile.setStyleSheet("font-size: 13px; font-weight: normal; color: #eee; margin-top:0;")
+        profile_layout.addWidget(lbl_profile)
+        self.spin_profile = QSpinBox()
+        self.spin_profile.setRange(1, 300)
+        self.spin_profile.setValue(10)
+        self.spin_profile.setSuffix(" s")
+        profile_layout.addWidget(self.spin_profile)
+        self.btn_profile = QPushButton()
+        self.btn_profile.clicked.connect(self.on_profile_clicked)
+        profile_layout.addWidget(self.btn_profile)
+        tools_layout.addLayout(profile_layout)
+
+        alloc_layout = QHBoxLayout()
+        self.btn_alloc = QPushButton()
+        self.btn_alloc.setToolTip("tracemalloc: mark a baseline, use the launcher, then show what grew.")
+        self.btn_alloc.clicked.connect(self.on_alloc_clicked)
+        alloc_layout.addWidget(self.btn_alloc)
+        self.btn_grid_leak = QPushButton(f"Grid Leak Check ({GRID_LEAK_ROUNDS}x refresh)")
+        self.btn_grid_leak.clicked.connect(self.on_grid_leak_clicked)
+        alloc_layout.addWidget(self.btn_grid_leak)
+        tools_layout.addLayout(alloc_layout)
+
+        layout.addWidget(self.dev_tools)
+        get_gui_profiler().finished.connect(self.on_profile_finished)
+        self.update_profiling_buttons()
+
         self.update_dev_ui_state()
 
         layout.addStretch()
@@ -178,9 +284,69 @@ class SettingsDialog(BaseFramelessDialog):
             self.lbl_dev_status.setText("❌ Public Version (Updates Enabled)")
             self.lbl_dev_status.setStyleSheet("color: #777;")
 
+        self.dev_tools.setVisible(is_dev)
+
         self.content_area.style().unpolish(self.dev_status_btn)
         self.content_area.style().polish(self.dev_status_btn)
 
+    def update_profiling_buttons(self):
+        running = get_gui_profiler().is_running()
+        self.btn_profile.setText("Stop Profile" if running else "Start Profile")
+        self.spin_profile.setEnabled(not running)
+        marked = get_allocation_tracker().is_marked()
+        self.btn_alloc.setText("Show Allocation Diff" if marked else "Take Allocation Baseline")
+        self.btn_grid_leak.setEnabled(not marked)
+
+    def show_report(self, title, path, text):
+        box = QMessageBox(self)
+        box.setWindowTitle(title)
+        box.setText(f"Saved to {path}")
+        box.setDetailedText(text)
+        box.exec()
+
+    def on_profile_clicked(self):
+        profiler = get_gui_profiler()
+        if profiler.is_running():
+            profiler.stop()
+        elif not profiler.start(self.spin_profile.value()):
+            QMessageBox.warning(self, "Profiler", "Another profiler is already active in this process.")
+        self.update_profiling_buttons()
+
+    @Slot(str, str)
+    def on_profile_finished(self, path, summary):
+        self.update_profiling_buttons()
+        self.show_report("GUI Profile", path, summary)
+
+    def on_alloc_clicked(self):
+        tracker = get_allocation_tracker()
+        if tracker.is_marked():
+            path, text = tracker.diff()
+            self.show_report("Allocation Diff", path, text)
+        else:
+            tracker.mark()
+        self.update_profiling_buttons()
+
+    def on_grid_leak_clicked(self):
+        window = self.parent()
+        if not hasattr(window, "refresh_grid"):
+            return
+
+        def settle():
+            # Cards are removed with deleteLater(); flush them so only real leaks remain.
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+            gc.collect()
+
+        tracker = get_allocation_tracker()
+        window.refresh_grid()
+        settle()
+        tracker.mark()
+        for _ in range(GRID_LEAK_ROUNDS):
+            window.refresh_grid()
+            settle()
+        path, text = tracker.diff()
+        self.update_profiling_buttons()
+        self.show_report("Grid Leak Check", path, text)
+
     def toggle_developer_mode(self):
         is_dev = self.current_settings.get("developer_mode", False)
 
@@ -199,24 +365,106 @@ class SettingsDialog(BaseFramelessDialog):
             else:
                 QMessageBox.warning(self, "Error", "Invalid Developer Code.")
 
+    def library_games(self):
+        """The current library, or None while it is not loaded or could not be read."""
+        parent = self.parent()
+        if hasattr(parent, "games"):
+            return list(parent.games) if getattr(parent, "library_loaded", True) else None
+        return load_games(strict=True)
+
+    def update_runner_usage(self):
+        manifest = get_runner_manifest()
+        games = self.library_games()
+        if games is None:
+            self.lbl_runner_usage.setText(
+                f"{len(manifest.runners())} runners installed, {format_size(manifest.total_size())} on disk · "
+                f"game library not loaded")
+            self.btn_prune.setEnabled(False)
+            return
+        manifest.update_references(games)
+        runners = manifest.runners()
+        unused = manifest.unreferenced()
+
+        self.lbl_runner_usage.setText(
+            f"{len(runners)} runners installed, {format_size(manifest.total_size())} on disk · "
+            f"{len(unused)} unused ({format_size(sum(e.get('size', 0) for e in unused))})"
+        )
+        self.btn_prune.setEnabled(bool(unused))
+
+    def on_prune_clicked(self):
+        manifest = get_runner_manifest()
+        games = self.library_games()
+        if games is None:
+            QMessageBox.warning(self, "Remove Unused Runners",
+                                "The game library is not loaded, so runner usage is unknown.")
+            self.update_runner_usage()
+            return
+        victims = manifest.prune(games, dry_run=True)
+        if not victims:
+            self.update_runner_usage()
+            return
+
+        names = "\n".join(f"• {e['type']} {e['version']}" for e in victims)
+        warning = "Your game library is empty, so every installed runner is listed.\n\n" if not games else ""
+        confirm = QMessageBox.question(self, "Remove Unused Runners",
+                                       f"{warning}No game uses these runners:\n\n{names}\n\nDelete them?",
+                                       QMessageBox.Yes | QMessageBox.No)
+        if confirm == QMessageBox.Yes:
+            self.btn_prune.setEnabled(False)
+            self.btn_prune.setText("Removing...")
+            get_task_executor().submit(manifest.prune, games,
+                                       on_done=self.on_prune_finished, on_error=self.on_prune_finished)
+
+    def on_prune_finished(self, _result):
+        self.btn_prune.setText("Remove Unused Runners")
+        self.update_runner_usage()
+
+    def on_export_metrics_clicked(self):
+        self.btn_export_metrics.setEnabled(False)
+        get_task_executor().submit(export_configured, get_settings_service().all(),
+                                   on_done=self.on_metrics_exported, on_error=self.on_metrics_exported)
+
+    def on_metrics_exported(self, result):
+        self.btn_export_metrics.setEnabled(True)
+        if isinstance(result, list) and result:
+            QMessageBox.information(self, "Metrics Exported", "Written to:\n\n" + "\n".join(result))
+        else:
+            QMessageBox.warning(self, "Metrics Export", f"Nothing was written.\n\n{result or 'No export path is set.'}")
+
     def on_check_update_clicked(self):
+        if updates_disabled():
+            QMessageBox.information(
+                self,
+                "Developer Mode",
+                "Developer Mode is ACTIVE.\n\nUpdates are disabled to protect your local changes."
+            )
+            return
+
         self.btn_check_update.setText("Checking...")
         self.btn_check_update.setEnabled(False)
-        self.repaint()
 
-        manual_check(self)
+        checker = get_update_checker()
+        checker.finished.connect(self.on_update_checked)
+        checker.check(force=True)
 
+    @Slot(dict)
+    def on_update_checked(self, result):
+        get_update_checker().finished.disconnect(self.on_update_checked)
         self.btn_check_update.setText("Check for Updates Now")
         self.btn_check_update.setEnabled(True)
+        show_update_result(self, result)
 
     def save_to_file(self):
         self.current_settings["minimize_on_launch"] = self.check_min_launch.isChecked()
         self.current_settings["minimize_to_tray_on_close"] = self.check_tray_close.isChecked()
         self.current_settings["check_updates"] = self.check_updates.isChecked()
-
-        save_settings(self.current_settings)
-
-        if self.parent() and hasattr(self.parent(), "load_user_settings"):
-            self.parent().load_user_settings()
+        self.current_settings["performance_mode"] = self.check_performance.isChecked()
+        self.current_settings["archive_cache_mb"] = self.spin_cache.value()
+        self.current_settings["proton_script_launch"] = self.check_proton_script.isChecked()
+        self.current_settings["wineserver_keepalive_s"] = self.spin_keepalive.value()
+        self.current_settings["background_throttle"] = self.check_throttle.isChecked()
+        self.current_settings["trace_enabled"] = self.check_trace.isChecked()
+
+        get_settings_service().update(self.current_settings)
 
         self.accept()
\ No newline at end of file
@@ -1,6 +1,7 @@
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsDropShadowEffect
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
+
+from skui.chrome import performance_mode
 
 
 class CustomTitleBar(QWidget):
@@ -65,8 +66,6 @@ class CustomTitleBar(QWidget):
         self.mouseDoubleClickEvent = self.handle_double_click
         self.start_pos = None
 
-        self.update_radius_shadow()
-
     def set_title(self, text):
         self.title_label.setText(text.upper())
 
@@ -81,28 +80,29 @@ class CustomTitleBar(QWidget):
         if event.button() == Qt.LeftButton:
             self.handle_max_restore()
 
+    def update_max_button(self):
+        self.max_btn.setText("❐" if self.parent.isMaximized() else "⬜")
+
     def update_radius_shadow(self):
-        if not hasattr(self.parent, "container"):
+        """Square corners without shadow when maximized or in performance
+        mode, rounded with shadow otherwise. The maximize button only
+        follows the window state."""
+        self.update_max_button()
+        if not hasattr(self.parent, "container") or not hasattr(self.parent, "window_shadow"):
             return
 
-        if self.parent.isMaximized():
-            self.parent.container.setGraphicsEffect(None)
+        if self.parent.isMaximized() or performance_mode():
+            self.parent.window_shadow.set_enabled(False)
             self.parent.layout().setContentsMargins(0, 0, 0, 0)
             self.parent.container.setStyleSheet("border-radius:0px; background:#080808;")
-            self.max_btn.setText("❐")
             self.close_btn.setStyleSheet("""
                 QPushButton { background: transparent; border: none; width: 46px; height: 42px; color: #555; font-size: 14px; border-radius: 0px; }
                 QPushButton:hover { background-color: #c0392b; color: white; border-radius: 0px; }
             """)
         else:
-            shadow = QGraphicsDropShadowEffect()
-            shadow.setBlurRadius(60)
-            shadow.setOffset(0, 0)
-            shadow.setColor(QColor(0, 0, 0, 220))
-            self.parent.container.setGraphicsEffect(shadow)
+            self.parent.window_shadow.set_enabled(True)
             self.parent.layout().setContentsMargins(10, 10, 10, 10)
             self.parent.container.setStyleSheet("border-radius:20px; background:#080808; border: 1px solid #222;")
-            self.max_btn.setText("⬜")
             self.close_btn.setStyleSheet("""
                 QPushButton { background: transparent; border: none; width: 46px; height: 42px; color: #555; font-size: 14px; border-radius: 0px; border-top-right-radius: 20px; }
                 QPushButton:hover { background-color: #c0392b; color: white; border-radius: 0px; border-top-right-radius: 20px; }